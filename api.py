@@ -0,0 +1,193 @@
+import asyncio
+import functools
+import json
+import math
+from urllib.parse import parse_qs
+import core
+import request_log
+
+# Headless JSON API over core.py, served by any ASGI server, e.g.
+#   uvicorn api:app --workers 4
+# Routes:
+#   GET  /health
+#   GET  /plan?age=3&gender=Male&meal_type=Veg&height=95&weight=14
+#   GET  /infant-plan?month=6%20months
+#   POST /plans            body: [{"age": 3, "gender": "Male", ...}, ...]
+
+MAX_BODY_BYTES = 1 << 20
+MAX_BATCH = 1000
+# Accepted measurement ranges; anything outside is a typo, not a child
+MAX_HEIGHT_CM = 300
+MAX_WEIGHT_KG = 500
+
+
+class BadRequest(Exception):
+    pass
+
+
+# Function to encode a JSON response body
+def _dumps(payload):
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+# Function to read and validate the plan parameters of one profile
+def _profile_args(params):
+    try:
+        age = int(params["age"])
+        gender = str(params["gender"])
+        meal_type = str(params["meal_type"])
+        height = float(params["height"])
+        weight = float(params["weight"])
+    except KeyError as exc:
+        raise BadRequest(f"Missing parameter {exc.args[0]!r}")
+    except (TypeError, ValueError):
+        raise BadRequest("age must be an integer and height/weight must be numbers")
+    if not (math.isfinite(height) and math.isfinite(weight)):
+        raise BadRequest("height and weight must be finite numbers")
+    if not 0 < height <= MAX_HEIGHT_CM:
+        raise BadRequest(f"height must be greater than 0 and at most {MAX_HEIGHT_CM} cm")
+    if not 0 < weight <= MAX_WEIGHT_KG:
+        raise BadRequest(f"weight must be greater than 0 and at most {MAX_WEIGHT_KG} kg")
+    return age, gender, meal_type, height, weight
+
+
+# Function to get the encoded plan rows and nutrition of one profile. Height and weight only reach
+# the plan through the BMI category, so a handful of profiles cover every request; the plan data
+# version is part of the key so an edited workbook is picked up
+@functools.lru_cache(maxsize=1024)
+def _plan_content(version, age, gender, meal_type, bmi_category):
+    records, nutrition = core.profile_plan_content(age, gender, meal_type, bmi_category)
+    return _dumps(records), _dumps(nutrition)
+
+
+# Function to encode the plan response for a profile: its own BMI fields around the memoized plan
+def _plan_body(version, args, bmi, assessment):
+    age, gender, meal_type = args[:3]
+    plan, nutrition = _plan_content(version, age, gender, meal_type, assessment['category'])
+    head = _dumps(core.recommendation_head(*args, bmi, assessment))
+    return head[:-1] + b',"plan":' + plan + b',"nutrition":' + nutrition + b'}'
+
+
+@functools.lru_cache(maxsize=None)
+def _infant_plan_body(month):
+    return _dumps(core.infant_plan(month))
+
+
+# Function to get a memoized function's hit count; compared before and after a call it tells
+# whether the memo answered (approximately, when requests overlap)
+def _memo_hits(func):
+    return func.cache_info().hits
+
+
+# Function to answer a single-profile plan request as (status, body, error message)
+def _plan_result(args):
+    age, gender, meal_type = args[:3]
+    with request_log.timed_event("api_plan", age=age, gender=gender, meal_type=meal_type) as event:
+        hits = _memo_hits(_plan_content)
+        try:
+            bmi, assessment = core.assess_profile(age, gender, *args[3:])
+            # Logged with the full profile the plan is looked up by, like the app's plan requests
+            event["bmi_category"] = assessment['category']
+            return 200, _plan_body(core.plan_version(), args, bmi, assessment), None
+        except ValueError as exc:
+            event["status"] = 400
+            return 400, None, str(exc)
+        except core.PlanNotFoundError as exc:
+            event["status"] = 404
+            return 404, None, str(exc)
+        finally:
+            event["cache_hit"] = _memo_hits(_plan_content) > hits
+
+
+# Function to answer an infant plan request as (status, body)
+def _infant_plan_result(month):
+    with request_log.timed_event("api_infant_plan", month=month) as event:
+        hits = _memo_hits(_infant_plan_body)
+        try:
+            return 200, _infant_plan_body(month)
+        except core.PlanNotFoundError as exc:
+            event["status"] = 404
+            return 404, _dumps({"error": str(exc)})
+        finally:
+            event["cache_hit"] = _memo_hits(_infant_plan_body) > hits
+
+
+# Function to route one request to (status, body bytes)
+def handle(method, path, query, body):
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    try:
+        if path == "/health" and method == "GET":
+            return 200, _dumps({"status": "ok"})
+        if path == "/plan" and method == "GET":
+            status, payload, error = _plan_result(_profile_args(params))
+            return status, payload if error is None else _dumps({"error": error})
+        if path == "/infant-plan" and method == "GET":
+            if "month" not in params:
+                raise BadRequest("Missing parameter 'month'")
+            return _infant_plan_result(params["month"])
+        if path == "/plans" and method == "POST":
+            try:
+                profiles = json.loads(body or b"[]")
+            except ValueError:
+                raise BadRequest("Body must be a JSON list of profiles")
+            if not isinstance(profiles, list) or len(profiles) > MAX_BATCH:
+                raise BadRequest(f"Body must be a JSON list of at most {MAX_BATCH} profiles")
+            # Each profile is answered in place: a malformed one gets an error entry like a failed lookup
+            parts = []
+            for profile in profiles:
+                try:
+                    if not isinstance(profile, dict):
+                        raise BadRequest("Each profile must be a JSON object")
+                    status, payload, error = _plan_result(_profile_args(profile))
+                except BadRequest as exc:
+                    status, payload, error = 400, None, str(exc)
+                parts.append(payload if error is None else _dumps({"status": status, "error": error}))
+            return 200, b"[" + b",".join(parts) + b"]"
+        if path in ("/health", "/plan", "/infant-plan", "/plans"):
+            return 405, _dumps({"error": f"Method {method} not allowed"})
+        return 404, _dumps({"error": f"Unknown path {path}"})
+    except BadRequest as exc:
+        return 400, _dumps({"error": str(exc)})
+
+
+# Function to read the full request body, refusing oversized ones
+async def _read_body(receive):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise BadRequest("Request body too large")
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+# ASGI entry point
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # Load the workbook before the first request instead of during it
+                await asyncio.get_running_loop().run_in_executor(None, core.warm_up)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    try:
+        body = await _read_body(receive) if scope["method"] == "POST" else b""
+        # Lookups, encoding and batches run on the default thread pool so the event loop keeps
+        # serving other connections
+        status, payload = await asyncio.get_running_loop().run_in_executor(
+            None, handle, scope["method"], scope["path"], scope.get("query_string", b"").decode("latin-1"), body)
+    except BadRequest as exc:
+        status, payload = 413, _dumps({"error": str(exc)})
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json"),
+                            (b"content-length", str(len(payload)).encode("ascii"))]})
+    await send({"type": "http.response.body", "body": payload})
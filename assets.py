@@ -0,0 +1,46 @@
+import io
+import os
+import threading
+from PIL import Image
+from profiling import record_cache
+
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Encoded image bytes keyed by (name, size, format, quality); each is decoded and resized once
+_images = {}
+_lock = threading.Lock()
+
+
+# Function to resolve an asset name relative to the app directory
+def asset_path(name):
+    return os.path.join(ASSET_DIR, name)
+
+
+# Function to decode, optionally resize, and re-encode an image file
+def _encode_image(path, size, format, quality):
+    with Image.open(path) as image:
+        if size is not None:
+            image = image.resize(size)
+        if format.upper() == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        out = io.BytesIO()
+        image.save(out, format=format, quality=quality, optimize=True)
+        return out.getvalue()
+
+
+# Function to get display-ready image bytes, cached for the life of the process
+def image_bytes(name, size=None, format=None, quality=85):
+    key = (name, size, format, quality)
+    data = _images.get(key)
+    record_cache("images", data is not None)
+    if data is not None:
+        return data
+    path = asset_path(name)
+    if size is None and format is None:
+        # Served exactly as stored: no decode needed at all
+        with open(path, "rb") as fh:
+            data = fh.read()
+    else:
+        data = _encode_image(path, size, format or "JPEG", quality)
+    with _lock:
+        return _images.setdefault(key, data)
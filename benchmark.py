@@ -0,0 +1,389 @@
+import argparse
+import copy
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+from contextlib import ExitStack, contextmanager
+from unittest import mock
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BASE_DIR, "benchmark_baseline.json")
+NEWS_FIXTURE = os.path.join(BASE_DIR, "fixtures", "news_everything.json")
+DEFAULT_SCALES = (10, 100, 1000)
+DEFAULT_REPEAT = 5
+# Cases slower than this per call (the 1000x workbook loads take over a minute) get fewer samples
+LONG_CASE_SECONDS = 10
+LONG_CASE_REPEAT = 3
+# A case is reported as a regression when its median is this many times the baseline median
+DEFAULT_TOLERANCE = 1.5
+
+# Streamlit calls made by the timed page functions; each is replaced by a no-op so the
+# benchmarks measure the app's own work and run without a Streamlit server
+STREAMLIT_CALLS = ("write", "markdown", "title", "header", "subheader", "caption", "warning", "error",
+                   "dataframe", "plotly_chart", "image", "download_button")
+
+
+# Function to replace Streamlit's output calls with no-ops while benchmarks run
+@contextmanager
+def stub_streamlit():
+    import streamlit as st
+    with ExitStack() as stack:
+        for name in STREAMLIT_CALLS:
+            stack.enter_context(mock.patch.object(st, name, lambda *args, **kwargs: None))
+        # Inputs take their default: the first option, or the given value
+        stack.enter_context(mock.patch.object(st, "selectbox", lambda label, options, *a, **kw: options[0]))
+        stack.enter_context(mock.patch.object(st, "number_input", lambda label, *a, **kw: kw.get("value", 0)))
+        yield st
+
+
+# Function to write a copy of the workbook with its rows repeated `scale` times (ages shifted so
+# every copy is a distinct set of profiles)
+def write_scaled_workbook(df, scale, directory):
+    import pandas as pd
+    copies = []
+    for i in range(scale):
+        part = df.copy()
+        part['Age'] = part['Age'] + 10 * i
+        copies.append(part)
+    path = os.path.join(directory, f"years_x{scale}.xlsx")
+    pd.concat(copies, ignore_index=True).to_excel(path, index=False)
+    return path
+
+
+# Function to load the recorded News API response used by the news benchmarks
+def load_news_fixture(path=NEWS_FIXTURE):
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+# Function to list (name, callable) benchmark cases for the data load paths
+def load_cases(workdir, scales):
+    import pandas as pd
+    import plan_store
+    import app
+
+    def cold_load(path):
+        # Fresh process: nothing in memory, binary cache empty
+        plan_store._snapshots.clear()
+        for name in os.listdir(plan_store.CACHE_DIR):
+            os.remove(os.path.join(plan_store.CACHE_DIR, name))
+        return app.load_data(path)
+
+    def restart_load(path):
+        # Restarted process: nothing in memory, binary cache present
+        plan_store._snapshots.clear()
+        return app.load_data(path)
+
+    cases = []
+    base = pd.read_excel(plan_store.EXCEL_PATH)
+    paths = [("years.xlsx", plan_store.EXCEL_PATH)]
+    for scale in scales:
+        paths.append((f"years.xlsx x{scale}", write_scaled_workbook(base, scale, workdir)))
+    for label, path in paths:
+        cases.append((f"load_data cold [{label}]", lambda path=path: cold_load(path)))
+        cases.append((f"load_data restart [{label}]", lambda path=path: restart_load(path)))
+        cases.append((f"load_data warm [{label}]", lambda path=path: app.load_data(path)))
+    return cases
+
+
+# Function to list benchmark cases for plan lookup and the infant plans
+def plan_cases():
+    import plan_store
+    import infant_plans
+    import app
+
+    df = app.load_data(plan_store.EXCEL_PATH)
+    # A copy is not the shared snapshot frame, so filter_data falls back to boolean masks
+    unindexed = df.copy()
+    profiles = list(df.groupby(plan_store.PLAN_KEY_COLUMNS, sort=False).groups)
+
+    def filter_all(frame):
+        for profile in profiles:
+            app.filter_data(frame, *profile)
+
+    def infant_all(cold):
+        for month in infant_plans.INFANT_MONTHS:
+            if cold:
+                infant_plans.infant_plan_frame.__wrapped__(month)
+            else:
+                app.generate_diet_plan(month)
+
+    return [
+        (f"filter_data indexed [{len(profiles)} profiles]", lambda: filter_all(df)),
+        (f"filter_data masks [{len(profiles)} profiles]", lambda: filter_all(unindexed)),
+        ("generate_diet_plan build [12 months]", lambda: infant_all(True)),
+        ("generate_diet_plan cached [12 months]", lambda: infant_all(False)),
+    ]
+
+
+# Function to list benchmark cases for the nutrition summary and every chart builder
+def chart_cases():
+    import plan_store
+    import charts
+    import nutrition
+    import app
+
+    plan = plan_store.lookup_plan(3, 'Male', 'Veg', 'Underweight')
+    infant = app.generate_diet_plan("8 months")
+    summary = nutrition.summarize_plan(plan)
+    infant_summary = nutrition.summarize_plan(infant)
+
+    return [
+        ("summarize_plan", lambda: nutrition.summarize_plan(plan)),
+        ("bar_chart_total_nutrition", lambda: app.bar_chart_total_nutrition(summary)),
+        ("animated_pie_chart separate", lambda: app.animated_pie_chart(summary, combined=False)),
+        ("build_nutrition_pie_figure", lambda: charts.build_nutrition_pie_figure(summary)),
+        ("animated_pie_chart combined (cached)", lambda: app.animated_pie_chart(summary)),
+        ("pie_chart_nutritional_info separate", lambda: app.pie_chart_nutritional_info(infant_summary, combined=False)),
+        ("bar_chart_nutritional_info", lambda: app.bar_chart_nutritional_info(infant_summary)),
+        ("build_total_nutrition_bar_figure", lambda: charts.build_total_nutrition_bar_figure(summary)),
+        ("build_nutrition_bar_figure", lambda: charts.build_nutrition_bar_figure(infant_summary)),
+    ]
+
+
+# Function to list benchmark cases for answering from a compiled plan bundle against the workbook path
+def bundle_cases(workdir):
+    import charts
+    import core
+    import plan_bundle
+    import plan_store
+    from infant_plans import INFANT_MONTHS
+
+    path = os.path.join(workdir, "plan_bundle.json.gz")
+    plan_bundle.compile_bundle(plan_store.EXCEL_PATH, path)
+    profiles = plan_bundle.all_profiles()
+
+    def cold_load():
+        plan_bundle._bundles.clear()
+        return plan_bundle.get_bundle(path)
+
+    def lookup_all(bundle_path):
+        with mock.patch.object(plan_bundle, "BUNDLE_PATH", bundle_path):
+            for profile in profiles:
+                core.lookup_profile_plan(*profile)
+            for month in INFANT_MONTHS:
+                core.lookup_infant_plan(month)
+
+    # Every figure is made again on each call: from the bundle's specs, or built with none loaded
+    def figures_all(compiled):
+        specs = plan_bundle.get_bundle(path).chart_specs() if compiled else {}
+        summaries = [plan_bundle.get_bundle(path).plan(*profile).summary for profile in profiles]
+        with mock.patch.object(charts, "_compiled_specs", specs):
+            charts._figures.clear()
+            for summary in summaries:
+                charts.nutrition_pie_figure(summary)
+                charts.total_nutrition_bar_figure(summary)
+
+    missing = os.path.join(workdir, "no_bundle.json.gz")
+    return [
+        ("load plan bundle", cold_load),
+        (f"lookup plans bundle [{len(profiles)} profiles + 12 months]", lambda: lookup_all(path)),
+        (f"lookup plans workbook [{len(profiles)} profiles + 12 months]", lambda: lookup_all(missing)),
+        (f"profile figures compiled [{len(profiles)} profiles]", lambda: figures_all(True)),
+        (f"profile figures built [{len(profiles)} profiles]", lambda: figures_all(False)),
+    ]
+
+
+# Function to list benchmark cases for the PDF generators
+def pdf_cases():
+    import plan_store
+    import nutrition
+    import reports
+    from bmi_measures import BMI_MEASURES
+
+    plan = plan_store.lookup_plan(3, 'Male', 'Veg', 'Underweight')
+    summary = nutrition.summarize_plan(plan)
+    columns = [plan_store.DAY_COLUMN] + plan_store.MEAL_COLUMNS
+    details = [("Age", "3 years"), ("Gender", "Male"), ("Type of Meal", "Veg")]
+
+    cases = []
+    for category, entry in BMI_MEASURES.items():
+        cases.append((f"render_measures_pdf [{category}]",
+                      lambda entry=entry: reports.render_measures_pdf(entry['title'], entry['measures'])))
+    cases.append(("generate_measures_pdf (cached)", lambda: reports.generate_measures_pdf('Normal weight')))
+    cases.append(("render_plan_pdf", lambda: reports.render_plan_pdf(io.BytesIO(), "Weekly Diet Plan", details,
+                                                                     plan, columns, summary)))
+    return cases
+
+
+# Function to list benchmark cases for the News page: sentiment scoring and the article loop
+def news_cases(fixture_path):
+    import sentiment
+    import app
+
+    fixture = load_news_fixture(fixture_path)
+    texts = [sentiment.article_text(article) for article in fixture['articles']]
+
+    def score_cold():
+        sentiment._scores.clear()
+        sentiment.score_articles(copy.deepcopy(fixture), processes=0)
+
+    class FixtureService:
+        def __init__(self, payload):
+            self.payload = sentiment.score_articles(copy.deepcopy(payload), processes=0)
+
+        def get(self, topic):
+            return self.payload
+
+    service = FixtureService(fixture)
+
+    def render_news_page():
+        with mock.patch("news.get_news_service", lambda *args, **kwargs: service), \
+                mock.patch.object(app, "get_news_api_key", lambda: "benchmark"):
+            app.News_page()
+
+    return [
+        (f"TextBlob polarity loop [{len(texts)} articles]", lambda: [sentiment.polarity(text) for text in texts]),
+        (f"score_articles cold [{len(texts)} articles]", score_cold),
+        (f"score_articles cached [{len(texts)} articles]",
+         lambda: sentiment.score_articles(copy.deepcopy(fixture), processes=0)),
+        ("News_page render [1 page]", render_news_page),
+    ]
+
+
+# Function to time one callable: calls per sample picked like `python -m timeit`, then `repeat` samples
+# (at most LONG_CASE_REPEAT for a case slower than LONG_CASE_SECONDS)
+def measure(func, repeat=DEFAULT_REPEAT):
+    timer = timeit.Timer(func)
+    number, seconds = timer.autorange()
+    if number == 1 and seconds > LONG_CASE_SECONDS:
+        repeat = min(repeat, LONG_CASE_REPEAT)
+    samples = [seconds / number for seconds in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "median_ms": statistics.median(samples) * 1000,
+        "min_ms": min(samples) * 1000,
+        "max_ms": max(samples) * 1000,
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+# Function to run every selected benchmark group and collect results by case name
+def run_benchmarks(groups, scales=DEFAULT_SCALES, repeat=DEFAULT_REPEAT, match=None, fixture_path=NEWS_FIXTURE,
+                   out=sys.stdout):
+    import plan_bundle
+    import plan_store
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir, stub_streamlit(), \
+            mock.patch.object(plan_store, "CACHE_DIR", os.path.join(workdir, "cache")), \
+            mock.patch.object(plan_bundle, "BUNDLE_PATH", os.path.join(workdir, "no_bundle.json.gz")):
+        # Binary cache in a scratch directory so runs neither reuse nor leave cache files, and no
+        # compiled plan bundle unless a case compiles one
+        os.makedirs(plan_store.CACHE_DIR)
+        builders = {
+            "load": lambda: load_cases(workdir, scales),
+            "plans": plan_cases,
+            "bundle": lambda: bundle_cases(workdir),
+            "charts": chart_cases,
+            "pdf": pdf_cases,
+            "news": lambda: news_cases(fixture_path),
+        }
+        for group in groups:
+            for name, func in builders[group]():
+                if match and match.lower() not in name.lower():
+                    continue
+                results[name] = dict(measure(func, repeat), group=group)
+                print(f"{name:<55} {results[name]['median_ms']:>10.3f} ms", file=out, flush=True)
+    return results
+
+
+# Function to format results as a table, with the change against a baseline when one is given
+def format_results(results, baseline=None):
+    baseline = baseline or {}
+    lines = [f"{'benchmark':<55} {'median ms':>10} {'min ms':>10} {'baseline':>10} {'ratio':>7}", "-" * 96]
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            reference = f"{'-':>10} {'-':>7}"
+        else:
+            reference = f"{before['median_ms']:>10.3f} {result['median_ms'] / before['median_ms']:>6.2f}x"
+        lines.append(f"{name:<55} {result['median_ms']:>10.3f} {result['min_ms']:>10.3f} {reference}")
+    return "\n".join(lines)
+
+
+# Function to list cases whose median slowed down past the tolerance
+def regressions(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    return [name for name, result in results.items()
+            if name in baseline and result['median_ms'] > baseline[name]['median_ms'] * tolerance]
+
+
+# Function to read a saved baseline file
+def load_baseline(path):
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)['results']
+
+
+# Function to get the CPU model name (from /proc/cpuinfo on Linux), or the processor type
+def cpu_model():
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as fh:
+            for line in fh:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+# Function to save results with enough context to tell which machine and interpreter they came from
+def save_baseline(results, path):
+    from importlib.metadata import version
+    payload = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu": cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "packages": {name: version(name) for name in ("pandas", "numpy", "pyarrow", "plotly", "streamlit",
+                                                      "openpyxl", "reportlab", "textblob")},
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(payload, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+
+
+def main(argv=None):
+    groups = ("load", "plans", "bundle", "charts", "pdf", "news")
+    parser = argparse.ArgumentParser(description="Time the app's data, lookup, chart, PDF and news paths offline.")
+    parser.add_argument("groups", nargs="*", metavar="group",
+                        help=f"benchmark groups to run: {', '.join(groups)} (default: all)")
+    parser.add_argument("-k", dest="match", help="only run cases whose name contains this text")
+    parser.add_argument("--scales", type=int, nargs="*", default=list(DEFAULT_SCALES),
+                        help="synthetic workbook sizes, as multiples of years.xlsx (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="samples per case")
+    parser.add_argument("--news-fixture", default=NEWS_FIXTURE, help="recorded News API response to score")
+    parser.add_argument("--save", nargs="?", const=BASELINE_PATH, help="write results as the new baseline")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_PATH,
+                        help="compare against a baseline; exit with status 1 on a regression")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown ratio before --compare fails (default: %(default)s)")
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.groups) - set(groups))
+    if unknown:
+        parser.error(f"unknown group(s): {', '.join(unknown)}")
+
+    baseline = load_baseline(args.compare) if args.compare else None
+    results = run_benchmarks(args.groups or groups, args.scales, args.repeat, args.match, args.news_fixture)
+    print()
+    print(format_results(results, baseline))
+    if args.save:
+        save_baseline(results, args.save)
+        print(f"Baseline written to {args.save}")
+    if baseline is not None:
+        slower = regressions(results, baseline, args.tolerance)
+        if slower:
+            print(f"Slower than {args.tolerance:g}x baseline: {', '.join(slower)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
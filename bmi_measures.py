@@ -0,0 +1,53 @@
+from types import MappingProxyType
+
+# Advice shown on the BMI Calculator page and in the downloadable PDF, per BMI category
+BMI_MEASURES = MappingProxyType({
+    'Underweight': MappingProxyType({
+        'heading': "Underweight measures:",
+        'title': "Underweight Measures",
+        'image': "underweight.jpeg",
+        'download_label': "Download Underweight Measures",
+        'file_name': "Underweight_Measures.pdf",
+        'measures': (
+            "Increase calorie intake.",
+            "Focus on foods rich in healthy fats, proteins, and complex carbohydrates.",
+            "Encourage consistent eating times to increase calorie intake.",
+            "If necessary, consider supplements under medical supervision.",
+            "Encourage regular exercise to build muscle and improve appetite.",
+            "Monitor growth and health status closely with healthcare professionals.",
+            "Engage parents or caregivers in meal planning and support strategies.",
+        ),
+    }),
+    'Normal weight': MappingProxyType({
+        'heading': "Normal weight measures:",
+        'title': "Normal Weight Measures",
+        'image': "Normalweight.jpeg",
+        'download_label': "Download Normalweight Measures",
+        'file_name': "Normalweight_Measures.pdf",
+        'measures': (
+            "Encourage a variety of nutrient-rich foods to support growth, development, and overall health.",
+            "Promote daily exercise and outdoor play to maintain fitness levels and support healthy growth.",
+            "Ensure children get enough sleep for their age to support physical and mental health.",
+            "Encourage regular water intake throughout the day to stay hydrated and support bodily functions.",
+            "Encourage moderation in screen time and promote activities that stimulate creativity and social interaction.",
+            "Foster a supportive and nurturing environment to promote positive mental health and emotional well-being.",
+            "Schedule routine medical visits to monitor growth, development, and overall health, including vaccinations and screenings as recommended by healthcare professionals.",
+        ),
+    }),
+    'Overweight': MappingProxyType({
+        'heading': "Overweight measures:",
+        'title': "Overweight Measures",
+        'image': "Overweight.jpeg",
+        'download_label': "Download Overweight Measures",
+        'file_name': "Overweight_Measures.pdf",
+        'measures': (
+            "Encourage a diet rich in fruits, vegetables, whole grains, and lean proteins while minimizing sugary drinks and high-fat, high-calorie foods.",
+            "Teach children about appropriate portion sizes and encourage mindful eating habits.",
+            "Promote daily physical activity to help burn calories and improve overall health.",
+            "Encourage less sedentary behavior by reducing screen time and promoting outdoor activities.",
+            "Involve the entire family in adopting healthy habits and setting a positive example.",
+            "Create a supportive environment at home and school that promotes healthy eating and physical activity.",
+            "Seek advice from healthcare professionals for personalized recommendations and support.",
+        ),
+    }),
+})
@@ -0,0 +1,108 @@
+import threading
+from collections import OrderedDict
+import plotly.express as px
+from plotly.subplots import make_subplots
+import plotly.graph_objects as go
+from profiling import profiled, record_cache
+
+# Figures keyed by (chart kind, plan key), most recently used last
+FIGURE_CACHE_SIZE = 256
+_figures = OrderedDict()
+_lock = threading.Lock()
+# Figure specs compiled ahead of time (see plan_bundle.py), keyed like _figures
+_compiled_specs = {}
+
+
+# Function to build one figure with a pie per nutrient, arranged in a grid
+@profiled("charts.build_nutrition_pie_figure")
+def build_nutrition_pie_figure(summary, columns=3):
+    rows = -(-len(summary.columns) // columns)
+    fig = make_subplots(rows=rows, cols=columns,
+                        specs=[[{'type': 'domain'}] * columns for _ in range(rows)],
+                        subplot_titles=[f'{column} Distribution' for column in summary.columns])
+    for i, column in enumerate(summary.columns):
+        fig.add_trace(go.Pie(labels=summary.days, values=summary.daily[:, i], name=column,
+                             hole=0.3, marker_colors=px.colors.qualitative.Set3),
+                      row=i // columns + 1, col=i % columns + 1)
+    fig.update_layout(height=350 * rows, title='Nutritional Distribution by Day')
+    return fig
+
+
+# Function to build a bar chart of a plan's weekly nutrient totals, one colour per nutrient
+@profiled("charts.build_total_nutrition_bar_figure")
+def build_total_nutrition_bar_figure(summary):
+    nutritional_columns = list(summary.columns)
+    return px.bar(x=nutritional_columns, y=summary.totals,
+                  labels={'x': 'Nutritional Category', 'y': 'Total Sum'},
+                  title='Total Nutritional Values in a Week',
+                  color=nutritional_columns)
+
+
+# Function to build a bar chart of a plan's weekly nutrient totals in the Set3 palette
+@profiled("charts.build_nutrition_bar_figure")
+def build_nutrition_bar_figure(summary):
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=list(summary.columns), y=summary.totals,
+                         marker_color=px.colors.qualitative.Set3))
+    fig.update_layout(title='Total Nutritional Values for the Week',
+                      xaxis_title='Nutrient',
+                      yaxis_title='Total Value',
+                      height=600, width=700)
+    return fig
+
+
+# Builders for every chart kind a plan can be drawn with
+CHART_BUILDERS = {
+    'nutrition_pie': build_nutrition_pie_figure,
+    'total_nutrition_bar': build_total_nutrition_bar_figure,
+    'nutrition_bar': build_nutrition_bar_figure,
+}
+
+
+# Function to serve figures from specs compiled ahead of time, as {(chart kind, plan key): spec};
+# replaces any specs set before
+def use_compiled_specs(specs):
+    global _compiled_specs
+    _compiled_specs = dict(specs)
+
+
+# Function to make a figure for a plan: from its compiled spec when there is one (already valid,
+# so it is not validated again), otherwise with the builder
+def _make_figure(kind, summary, builder):
+    spec = _compiled_specs.get((kind, summary.key))
+    if spec is not None:
+        return go.Figure(spec, _validate=False)
+    return builder(summary)
+
+
+# Function to get a cached figure for a plan (shared between sessions, do not modify), building it
+# only on a miss
+def cached_figure(kind, summary, builder):
+    key = (kind, summary.key)
+    with _lock:
+        if key in _figures:
+            _figures.move_to_end(key)
+            record_cache("figures", True)
+            return _figures[key]
+    record_cache("figures", False)
+    figure = _make_figure(kind, summary, builder)
+    with _lock:
+        figure = _figures.setdefault(key, figure)
+        while len(_figures) > FIGURE_CACHE_SIZE:
+            _figures.popitem(last=False)
+    return figure
+
+
+# Function to get the combined nutrient pie figure for a plan
+def nutrition_pie_figure(summary):
+    return cached_figure('nutrition_pie', summary, build_nutrition_pie_figure)
+
+
+# Function to get the weekly totals bar figure for a plan
+def total_nutrition_bar_figure(summary):
+    return cached_figure('total_nutrition_bar', summary, build_total_nutrition_bar_figure)
+
+
+# Function to get the weekly totals bar figure (Set3 palette) for a plan
+def nutrition_bar_figure(summary):
+    return cached_figure('nutrition_bar', summary, build_nutrition_bar_figure)
@@ -0,0 +1,138 @@
+import argparse
+import os
+import sys
+import numpy as np
+import pandas as pd
+import plan_store
+import growth
+
+# Input columns expected in a cohort file (one child per row)
+COHORT_COLUMNS = ['age', 'gender', 'height', 'weight', 'meal_type']
+DEFAULT_CHUNKSIZE = 50_000
+
+# Weekly nutrition per plan profile, rebuilt when the workbook changes
+_profile_totals = {}
+
+
+# Function to compute BMI for arrays of heights (cm) and weights (kg); non-positive heights give NaN
+def bmi_array(heights, weights):
+    heights = np.asarray(heights, dtype=np.float64) / 100
+    weights = np.asarray(weights, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(heights > 0, weights / heights ** 2, np.nan)
+
+
+# Function to get one row of weekly nutrient totals per plan profile in the workbook
+def profile_totals(excel_path=plan_store.EXCEL_PATH):
+    snapshot = plan_store.get_snapshot(excel_path)
+    frame = _profile_totals.get(snapshot.digest)
+    if frame is None:
+        grouped = snapshot.frame.groupby(plan_store.PLAN_KEY_COLUMNS, sort=False)
+        frame = grouped[plan_store.NUTRIENT_COLUMNS].sum()
+        frame.insert(0, 'plan_days', grouped.size())
+        frame = frame.reset_index()
+        _profile_totals.clear()
+        _profile_totals[snapshot.digest] = frame
+    return frame
+
+
+# Function to classify one chunk of children and join each to its plan
+def process_chunk(chunk, excel_path=plan_store.EXCEL_PATH, expand=False):
+    missing = [column for column in COHORT_COLUMNS if column not in chunk.columns]
+    if missing:
+        raise ValueError(f"Cohort file is missing column(s): {', '.join(missing)}")
+    result = chunk.copy()
+    result['bmi'] = bmi_array(chunk['height'], chunk['weight'])
+    # Children are classified on the WHO BMI-for-age reference for their age (years) and sex; ages
+    # outside the reference (0-5 years) are left unclassified
+    ages = pd.to_numeric(chunk['age'], errors='coerce')
+    result['bmi_zscore'] = growth.bmi_zscores(ages.to_numpy(dtype=np.float64) * 12, chunk['gender'].to_numpy(),
+                                              result['bmi'].to_numpy())
+    result['bmi_percentile'] = growth.zscore_percentiles(result['bmi_zscore'])
+    result['bmi_category'] = growth.classify_zscores(result['bmi_zscore'])
+    keys = pd.DataFrame({'Age': ages, 'Gender': chunk['gender'],
+                         'Type of Meal': chunk['meal_type'], 'BMI': result['bmi_category']}, index=chunk.index)
+    if expand:
+        # One output row per child per plan day, with the meal columns
+        plans = plan_store.get_snapshot(excel_path).frame
+        plan_columns = plan_store.PLAN_KEY_COLUMNS + [plan_store.DAY_COLUMN] + plan_store.MEAL_COLUMNS \
+            + plan_store.NUTRIENT_COLUMNS
+        # Plan rows missing part of their key belong to no profile (lookups skip them too)
+        plans = plans[plan_columns].dropna(subset=plan_store.PLAN_KEY_COLUMNS)
+        joined = pd.concat([result, keys], axis=1).merge(plans, how='left', on=plan_store.PLAN_KEY_COLUMNS)
+        return joined.drop(columns=plan_store.PLAN_KEY_COLUMNS)
+    joined = pd.concat([result, keys], axis=1).merge(profile_totals(excel_path), how='left',
+                                                     on=plan_store.PLAN_KEY_COLUMNS)
+    joined['plan_days'] = joined['plan_days'].fillna(0).astype('int64')
+    return joined.drop(columns=plan_store.PLAN_KEY_COLUMNS)
+
+
+# Function to iterate over a CSV or Parquet cohort file in chunks
+def read_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    if path.lower().endswith(('.parquet', '.pq')):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+class _ChunkWriter:
+    # Streams result chunks to a CSV or Parquet file, writing the header/schema once
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.lower().endswith(('.parquet', '.pq'))
+        self._writer = None
+        self._first = True
+
+    def write(self, chunk):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            chunk.to_csv(self.path, mode='w' if self._first else 'a', header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+# Function to classify a whole cohort file and stream the results to an output file
+def process_cohort(input_path, output_path, chunksize=DEFAULT_CHUNKSIZE, excel_path=plan_store.EXCEL_PATH,
+                   expand=False):
+    writer = _ChunkWriter(output_path)
+    rows = 0
+    try:
+        for chunk in read_chunks(input_path, chunksize):
+            writer.write(process_chunk(chunk, excel_path, expand))
+            rows += len(chunk)
+    finally:
+        writer.close()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compute BMI categories and diet plans for a cohort file "
+                    f"with columns {', '.join(COHORT_COLUMNS)} (CSV or Parquet).")
+    parser.add_argument("input", help="cohort CSV or Parquet file")
+    parser.add_argument("output", help="output CSV or Parquet file")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="rows per chunk")
+    parser.add_argument("--excel", default=plan_store.EXCEL_PATH, help="meal-plan workbook")
+    parser.add_argument("--expand", action="store_true",
+                        help="write one row per child per plan day instead of weekly totals")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.input):
+        parser.error(f"{args.input} does not exist")
+    rows = process_cohort(args.input, args.output, args.chunksize, args.excel, args.expand)
+    print(f"Processed {rows} children into {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+import math
+
+# UI-free plan logic shared by the Streamlit app (app.py) and the JSON API (api.py).
+# pandas-backed modules are imported on first use, as in app.py.
+
+
+# Adult BMI cutoffs, used when no age/sex is known (children are assessed with growth.py)
+UNDERWEIGHT_BELOW = 18.5
+OVERWEIGHT_FROM = 25
+
+
+class PlanNotFoundError(LookupError):
+    pass
+
+
+# Function to calculate BMI from height in cm and weight in kg
+def calculate_bmi(height, weight):
+    if height <= 0:
+        raise ValueError("Height must be greater than zero for BMI calculation.")
+    return weight / ((height / 100) ** 2)  # Height in meters
+
+
+# Function to assess a child's BMI against the WHO BMI-for-age reference for their age and sex
+def assess_bmi(calculated_bmi, age_years, gender):
+    import growth
+    return growth.assess_child(age_years * 12, gender, calculated_bmi)
+
+
+# Function to predict BMI category; with age (years) and gender the child growth reference
+# is used, otherwise the fixed adult cutoffs below
+def predict_bmi_category(calculated_bmi, age=None, gender=None):
+    if age is not None and gender is not None:
+        return assess_bmi(calculated_bmi, age, gender)['category']
+    if calculated_bmi < UNDERWEIGHT_BELOW:
+        return 'Underweight'
+    elif UNDERWEIGHT_BELOW <= calculated_bmi < OVERWEIGHT_FROM:
+        return 'Normal weight'
+    else:
+        return 'Overweight'
+
+
+# Function to filter the meal-plan frame to one profile's 7-day plan
+def filter_data(df, age, gender, meal_type, bmi_category):
+    import plan_store
+    snapshot = plan_store.snapshot_for(df)
+    if snapshot is not None:
+        # Shared workbook frame: answer from the prebuilt index
+        return snapshot.lookup(age, gender, meal_type, bmi_category)
+    return df[_matches(df['Age'], age) &
+              _matches(df['Gender'], gender) &
+              _matches(df['Type of Meal'], meal_type) &
+              _matches(df['BMI'], bmi_category)]
+
+
+# Function to get the rows of a column equal to a value; categorical columns (see
+# plan_store.compact_plan_frame) are compared on their integer codes
+def _matches(column, value):
+    if hasattr(column, 'cat'):
+        categories = column.cat.categories
+        code = categories.get_loc(value) if value in categories else -2
+        return column.cat.codes.to_numpy() == code
+    return (column == value).to_numpy(dtype=bool, na_value=False)
+
+
+# Function to get the diet plan for a baby below 1 year (shared frame, do not modify)
+def generate_diet_plan(age):
+    from infant_plans import infant_plan_frame
+    return infant_plan_frame(age)
+
+
+# Function to get one profile's plan frame and nutrition summary: from the compiled plan bundle
+# when one is deployed (see plan_bundle.py), otherwise looked up in the workbook
+def lookup_profile_plan(age, gender, meal_type, bmi_category):
+    import plan_bundle
+    bundle = plan_bundle.get_bundle()
+    compiled = bundle.plan(age, gender, meal_type, bmi_category) if bundle is not None else None
+    if compiled is not None:
+        return compiled.frame, compiled.summary
+    import plan_store
+    from nutrition import plan_summary
+    plan = plan_store.lookup_plan(age, gender, meal_type, bmi_category)
+    return plan, plan_summary(plan)
+
+
+# Function to get a baby's plan frame and nutrition summary, from the compiled plan bundle when
+# one is deployed
+def lookup_infant_plan(month):
+    import plan_bundle
+    bundle = plan_bundle.get_bundle()
+    compiled = bundle.infant_plan(month) if bundle is not None else None
+    if compiled is not None:
+        return compiled.frame, compiled.summary
+    from nutrition import plan_summary
+    plan = generate_diet_plan(month)
+    return plan, plan_summary(plan)
+
+
+# Function to turn plan rows into JSON-ready dicts (missing cells become None)
+def plan_records(plan, columns):
+    records = []
+    for row in plan[columns].itertuples(index=False, name=None):
+        record = {}
+        for column, value in zip(columns, row):
+            if hasattr(value, "item"):
+                value = value.item()
+            if isinstance(value, float) and math.isnan(value):
+                value = None
+            record[column] = value
+        records.append(record)
+    return records
+
+
+# Function to turn a nutrition summary into JSON-ready totals and daily means
+def nutrition_dict(summary):
+    return {
+        "totals": dict(zip(summary.columns, summary.totals.tolist())),
+        "daily_means": dict(zip(summary.columns, summary.means.tolist())),
+    }
+
+
+# Function to assess a 1-5 year old's BMI from height and weight: (bmi, assessment)
+def assess_profile(age, gender, height, weight):
+    bmi = calculate_bmi(height, weight)
+    return bmi, assess_bmi(bmi, age, gender)
+
+
+# Function to get one profile's plan rows and weekly nutrition, JSON-ready
+def profile_plan_content(age, gender, meal_type, bmi_category):
+    import plan_bundle
+    import plan_store
+    from nutrition import plan_summary
+    bundle = plan_bundle.get_bundle()
+    compiled = bundle.plan(age, gender, meal_type, bmi_category) if bundle is not None else None
+    if compiled is not None:
+        # Rows and totals were made JSON-ready when the bundle was compiled
+        records, nutrition = compiled.records, compiled.nutrition
+    else:
+        plan = plan_store.lookup_plan(age, gender, meal_type, bmi_category)
+        columns = [plan_store.DAY_COLUMN] + plan_store.MEAL_COLUMNS + plan_store.NUTRIENT_COLUMNS
+        records, nutrition = plan_records(plan, columns), nutrition_dict(plan_summary(plan))
+    if not records:
+        raise PlanNotFoundError(f"No diet plan for age {age}, {gender}, {meal_type}, {bmi_category}")
+    return records, nutrition
+
+
+# Function to get the BMI fields of a recommendation (everything but the plan and its nutrition)
+def recommendation_head(age, gender, meal_type, height, weight, bmi, assessment):
+    return {
+        "profile": {"age": age, "gender": gender, "meal_type": meal_type, "height": height, "weight": weight},
+        "bmi": bmi,
+        "bmi_category": assessment['category'],
+        "bmi_zscore": assessment['zscore'],
+        "bmi_percentile": assessment['percentile'],
+    }
+
+
+# Function to build the full recommendation for a 1-5 year old
+def recommend_plan(age, gender, meal_type, height, weight):
+    bmi, assessment = assess_profile(age, gender, height, weight)
+    records, nutrition = profile_plan_content(age, gender, meal_type, assessment['category'])
+    return {**recommendation_head(age, gender, meal_type, height, weight, bmi, assessment),
+            "plan": records, "nutrition": nutrition}
+
+
+# Function to build the plan for a baby below 1 year
+def infant_plan(month):
+    import plan_bundle
+    from infant_plans import INFANT_PLANS
+    from nutrition import plan_summary
+    if month not in INFANT_PLANS:
+        raise PlanNotFoundError(f"No infant diet plan for age {month!r}")
+    bundle = plan_bundle.get_bundle()
+    compiled = bundle.infant_plan(month) if bundle is not None else None
+    if compiled is not None:
+        return {"profile": {"month": month}, "plan": compiled.records, "nutrition": compiled.nutrition}
+    plan = generate_diet_plan(month)
+    return {
+        "profile": {"month": month},
+        "plan": plan_records(plan, list(plan.columns)),
+        "nutrition": nutrition_dict(plan_summary(plan)),
+    }
+
+
+# Function to tell whether plans are answered from a compiled plan bundle
+def plans_precompiled():
+    import plan_bundle
+    return plan_bundle.get_bundle() is not None
+
+
+# Function to load the shared plan data ahead of the first request
+def warm_up():
+    import plan_bundle
+    import plan_store
+    if plan_bundle.get_bundle() is None:
+        plan_store.get_snapshot()
+
+
+# Function to get the version of the plan data currently served: the compiled bundle's version
+# when one is deployed, otherwise the workbook's content hash
+def plan_version():
+    import plan_bundle
+    import plan_store
+    bundle = plan_bundle.get_bundle()
+    if bundle is not None:
+        return bundle.version
+    return plan_store.get_snapshot().digest
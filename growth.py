@@ -0,0 +1,104 @@
+import csv
+import math
+import os
+import numpy as np
+
+# WHO Child Growth Standards (2006) BMI-for-age LMS parameters, one row per sex and
+# completed month 0-60 (length-based below 24 months, height-based from 24 months)
+LMS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "who_bmi_for_age.csv")
+SEXES = ('Male', 'Female')
+MAX_MONTH = 60
+
+# z-score cutoffs for children under 5 (WHO: below -2 thinness, above +2 overweight),
+# mapped onto the values of the BMI column in years.xlsx
+THIN_BELOW_Z = -2.0
+OVERWEIGHT_ABOVE_Z = 2.0
+CATEGORIES = ('Underweight', 'Normal weight', 'Overweight')
+
+
+# Function to load the LMS table into (sex, month) arrays
+def _load_lms(path=LMS_PATH):
+    table = np.full((3, len(SEXES), MAX_MONTH + 1), np.nan)
+    with open(path, newline="") as fh:
+        for row in csv.DictReader(fh):
+            sex, month = SEXES.index(row['sex']), int(row['month'])
+            table[:, sex, month] = float(row['L']), float(row['M']), float(row['S'])
+    if np.isnan(table).any():
+        raise ValueError(f"{path} does not cover every sex and month 0-{MAX_MONTH}")
+    table.setflags(write=False)
+    return table
+
+
+LMS = _load_lms()
+
+
+# Function to look up L, M, S for arrays of ages (months) and sex indexes, interpolating between months;
+# a missing age, or one outside the reference (0-MAX_MONTH months), gives NaN
+def lms_at(age_months, sex_index):
+    age = np.asarray(age_months, dtype=np.float64)
+    with np.errstate(invalid='ignore'):
+        known = (age >= 0) & (age <= MAX_MONTH)
+    # Unknown ages are looked up at month 0 and blanked afterwards
+    age = np.where(known, age, 0)
+    sex_index = np.asarray(sex_index, dtype=np.intp)
+    lower = np.minimum(np.floor(age).astype(np.intp), MAX_MONTH - 1)
+    frac = age - lower
+    return tuple(np.where(known, LMS[i, sex_index, lower] * (1 - frac) + LMS[i, sex_index, lower + 1] * frac, np.nan)
+                 for i in range(3))
+
+
+# Function to get the measurement at a given z-score for L, M, S arrays
+def _value_at(z, l, m, s):
+    return m * (1 + l * s * z) ** (1 / l)
+
+
+# Function to compute BMI-for-age z-scores (vectorized); an unknown or out-of-reference age, unknown sex
+# or a missing or non-positive BMI gives NaN
+def bmi_zscores(age_months, sexes, bmi):
+    sexes = np.asarray(sexes, dtype=object)
+    sex_index = np.where(sexes == SEXES[1], 1, 0)
+    known = (sexes == SEXES[0]) | (sexes == SEXES[1])
+    bmi = np.asarray(bmi, dtype=np.float64)
+    l, m, s = lms_at(age_months, sex_index)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = ((bmi / m) ** l - 1) / (l * s)
+        # WHO restricted application of the LMS method beyond +/-3 SD
+        sd3_pos, sd2_pos = _value_at(3, l, m, s), _value_at(2, l, m, s)
+        sd3_neg, sd2_neg = _value_at(-3, l, m, s), _value_at(-2, l, m, s)
+        z = np.where(z > 3, 3 + (bmi - sd3_pos) / (sd3_pos - sd2_pos), z)
+        z = np.where(z < -3, -3 + (bmi - sd3_neg) / (sd2_neg - sd3_neg), z)
+    return np.where(known & (bmi > 0), z, np.nan)
+
+
+# Function to map z-scores to the workbook's BMI categories (None where z is NaN)
+def classify_zscores(z):
+    z = np.asarray(z, dtype=np.float64)
+    return np.select([z < THIN_BELOW_Z, z <= OVERWEIGHT_ABOVE_Z, z > OVERWEIGHT_ABOVE_Z],
+                     list(CATEGORIES), default=None)
+
+
+# math.erf over arrays (NaN stays NaN)
+_erf = np.frompyfunc(math.erf, 1, 1)
+
+
+# Function to convert z-scores to percentiles (0-100)
+def zscore_percentiles(z):
+    x = np.asarray(z, dtype=np.float64) / math.sqrt(2)
+    return 50 * (1 + np.asarray(_erf(x), dtype=np.float64))
+
+
+# Function to assess one child: BMI-for-age z-score, percentile and category
+def assess_child(age_months, sex, bmi):
+    if sex not in SEXES:
+        raise ValueError(f"Cannot assess BMI for sex {sex!r}; expected one of {', '.join(SEXES)}")
+    if not 0 <= age_months <= MAX_MONTH:
+        raise ValueError(f"Cannot assess BMI at age {age_months:g} months; "
+                         f"the BMI-for-age reference covers 0-{MAX_MONTH} months")
+    if not bmi > 0:
+        raise ValueError(f"Cannot assess BMI {bmi!r}; BMI must be greater than zero")
+    z = float(bmi_zscores([age_months], [sex], [bmi])[0])
+    return {
+        "zscore": z,
+        "percentile": float(zscore_percentiles(z)),
+        "category": CATEGORIES[0] if z < THIN_BELOW_Z else CATEGORIES[2] if z > OVERWEIGHT_ABOVE_Z else CATEGORIES[1],
+    }
@@ -0,0 +1,61 @@
+import argparse
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BUDGET_MS = 1500
+
+
+# Function to run a statement under `python -X importtime` and return the raw report lines
+def run_importtime(statement, python=sys.executable):
+    result = subprocess.run([python, "-X", "importtime", "-c", statement], cwd=BASE_DIR,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{statement!r} failed:\n{result.stderr[-2000:]}")
+    return result.stderr.splitlines()
+
+
+# Function to parse importtime lines into (module, self_us, cumulative_us, depth) rows
+def parse_importtime(lines):
+    rows = []
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+# Function to format the slowest top-level imports as a table
+def format_report(rows, top=25):
+    total_us = sum(self_us for _, self_us, _, _ in rows)
+    heaviest = sorted((row for row in rows if row[3] <= 1), key=lambda row: row[2], reverse=True)[:top]
+    lines = [f"{'module':<50} {'self ms':>9} {'cumul ms':>9}", "-" * 70]
+    for name, self_us, cumulative_us, _ in heaviest:
+        lines.append(f"{name:<50} {self_us / 1000:>9.1f} {cumulative_us / 1000:>9.1f}")
+    lines.append("-" * 70)
+    lines.append(f"{len(rows)} modules imported, {total_us / 1000:.1f} ms total")
+    return "\n".join(lines), total_us / 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report module import time for a cold start of the app.")
+    parser.add_argument("statement", nargs="?", default="import app",
+                        help="Python statement to time (default: %(default)r)")
+    parser.add_argument("--top", type=int, default=25, help="number of modules to list")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="exit with status 1 if total import time exceeds this")
+    args = parser.parse_args(argv)
+
+    table, total_ms = format_report(parse_importtime(run_importtime(args.statement)), args.top)
+    print(table)
+    if total_ms > args.budget_ms:
+        print(f"Over budget: {total_ms:.1f} ms > {args.budget_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+import functools
+from types import MappingProxyType
+import pandas as pd
+from plan_store import DAY_COLUMN, NUTRIENT_COLUMNS
+
+WEEK_DAYS = ('Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday')
+
+# Meal and nutrient columns for each month, one value per day in WEEK_DAYS order
+_PLAN_DATA = {
+    "1 month": {
+        'Diet Plan': ['Breast Milk / Formula Milk'] * 7,
+        'Amount': ['Every 2-3 hours / 2-3 ounces'] * 7,
+        'Frequency': ['8-12 times'] * 7,
+        'Total Calorie (kcal)': [120] * 7,
+        'Total Protein (g)': [8] * 7,
+        'Total Fat (g)': [5] * 7,
+        'Total Carbohydrate (g)': [12] * 7,
+        'Total Vitamin (IU)': [400] * 7,
+        'Total Mineral (mg)': [200] * 7,
+    },
+    "2 months": {
+        'Diet Plan': ['Breast Milk / Formula Milk'] * 7,
+        'Amount': ['Every 2-3 hours / 4 ounces'] * 7,
+        'Frequency': ['8-12 times / 6-8 times'] * 7,
+        'Total Calorie (kcal)': [130] * 7,
+        'Total Protein (g)': [9] * 7,
+        'Total Fat (g)': [6] * 7,
+        'Total Carbohydrate (g)': [15] * 7,
+        'Total Vitamin (IU)': [450] * 7,
+        'Total Mineral (mg)': [220] * 7,
+    },
+    "3 months": {
+        'Diet Plan': ['Breast Milk / Formula Milk'] * 7,
+        'Amount': ['Every 3-4 hours / 4-6 ounces'] * 7,
+        'Frequency': ['6-7 times / 5-6 times'] * 7,
+        'Total Calorie (kcal)': [140] * 7,
+        'Total Protein (g)': [10] * 7,
+        'Total Fat (g)': [7] * 7,
+        'Total Carbohydrate (g)': [18] * 7,
+        'Total Vitamin (IU)': [500] * 7,
+        'Total Mineral (mg)': [250] * 7,
+    },
+    "4 months": {
+        'Diet Plan': ['Breast Milk / Formula Milk'] * 7,
+        'Amount': ['Every 3-4 hours / 4-8 ounces'] * 7,
+        'Frequency': ['6-7 times / 5-7 times'] * 7,
+        'Total Calorie (kcal)': [150] * 7,
+        'Total Protein (g)': [11] * 7,
+        'Total Fat (g)': [8] * 7,
+        'Total Carbohydrate (g)': [20] * 7,
+        'Total Vitamin (IU)': [550] * 7,
+        'Total Mineral (mg)': [270] * 7,
+    },
+    "5 months": {
+        'Diet Plan': ['Breast Milk / Formula Milk'] * 7,
+        'Amount': ['Every 3-4 hours / 5-8 ounces'] * 7,
+        'Frequency': ['6-7 times / 5-7 times'] * 7,
+        'Total Calorie (kcal)': [160] * 7,
+        'Total Protein (g)': [12] * 7,
+        'Total Fat (g)': [9] * 7,
+        'Total Carbohydrate (g)': [22] * 7,
+        'Total Vitamin (IU)': [600] * 7,
+        'Total Mineral (mg)': [300] * 7,
+    },
+    "6 months": {
+        'Early Morning': ['Breast Milk / Formula Milk'] * 7,
+        'Breakfast': ['Avocado Puree', 'Banana Puree', 'Cheeku Puree', 'Apple Sauce', 'Suji Halwa', 'Sweet Potato Mash', 'Rice Cereal'],
+        'Mid-Morning': ['Breast Milk / Formula Milk'] * 7,
+        'Lunch': ['Ground and Sweet Potato Puree', 'Moong Dal Soup', 'Pureed Kichidi', 'Carrot Mash', 'Pumpkin Puree', 'Masoor Dal Soup', 'Pumpkin and Carrot Mash'],
+        'Afternoon': ['Breast Milk / Formula Milk'] * 7,
+        'Dinner': ['Suji Kheer', 'Ragi Porridge', 'Suji Kheer', 'Rice Gruel', 'Sweet Potato Kheer', 'Dal Rice Puree', 'Moong Dal Soup'],
+        'Late Night': ['Breast Milk / Formula Milk'] * 7,
+        'Total Calorie (kcal)': [200, 150, 180, 160, 190, 170, 160],
+        'Total Protein (g)': [8, 7, 9, 6, 8, 7, 6],
+        'Total Fat (g)': [10, 8, 9, 7, 9, 8, 7],
+        'Total Carbohydrate (g)': [25, 20, 22, 18, 23, 21, 20],
+        'Total Vitamin (IU)': [600] * 7,
+        'Total Mineral (mg)': [350, 300, 320, 280, 330, 310, 300],
+    },
+    "7 months": {
+        'Early Morning': ['Breast Milk / Formula Milk'] * 7,
+        'Breakfast': ['Pear Puree', 'Ragi Apple Porridge', 'Pear Puree', 'Khichdi', 'Wheat Pancakes', 'Idli with Dal', 'Ragi Porridge'],
+        'Mid-Morning': ['Breast Milk / Formula Milk'] * 7,
+        'Lunch': ['Ground and Sweet Potato Puree', 'Ghee Rice', 'Broken Wheat Khichdi', 'Rice with Curd', 'Fish Puree', 'Khichdi', 'Rice with Curd'],
+        'Evening Snack': ['Carrot Badam Kheer', 'Yogurt (Flavoured with Fruit)', 'Lentil Soup', 'Boiled Vegetable Bowl', 'Carrot Badam Kheer', 'Banana', 'Lentil Soup'],
+        'Mid-Evening': ['Breast Milk / Formula Milk'] * 7,
+        'Dinner': ['Ragi Porridge', 'Millet Porridge', 'Curd Rice', 'Rice Porridge', 'Ragi Porridge', 'Moongdal Khichdi', 'Millet Porridge'],
+        'Late Night': ['Breast Milk / Formula Milk'] * 7,
+        'Total Calorie (kcal)': [220, 180, 200, 210, 240, 190, 200],
+        'Total Protein (g)': [9, 8, 9, 10, 11, 8, 9],
+        'Total Fat (g)': [12, 10, 11, 11, 13, 10, 11],
+        'Total Carbohydrate (g)': [28, 25, 26, 27, 30, 28, 26],
+        'Total Vitamin (IU)': [650] * 7,
+        'Total Mineral (mg)': [380, 340, 360, 370, 400, 350, 360],
+    },
+    "8 months": {
+        'Early Morning': ['Breast Milk / Formula Milk'] * 7,
+        'Breakfast': ['Ragi Apple Porridge', 'Wheat Pancakes', 'Pear Puree', 'Pear Puree', 'Ragi Porridge', 'Idli with Dal', 'Khichdi'],
+        'Mid-Morning': ['Breast Milk / Formula Milk'] * 7,
+        'Lunch': ['Ghee Rice', 'Fish Puree', 'Ground and Sweet Potato Puree', 'Broken Wheat Khichidi', 'Rice with Curd', 'Khichdi', 'Rice with Curd'],
+        'Evening Snack': ['Yogurt (Flavoured with Fruit)', 'Carrot Badam Kheer', 'Carrot Badam Kheer', 'Lentil Soup', 'Lentil Soup', 'Banana', 'Boiled Vegetable Bowl'],
+        'Mid-Evening': ['Breast Milk / Formula Milk'] * 7,
+        'Dinner': ['Millet Porridge', 'Ragi Porridge', 'Ragi Porridge', 'Curd Rice', 'Millet Porridge', 'Moongdal Khichdi', 'Rice Porridge'],
+        'Late Night': ['Breast Milk / Formula Milk'] * 7,
+        'Total Calorie (kcal)': [240, 220, 230, 250, 260, 210, 240],
+        'Total Protein (g)': [10, 9, 10, 11, 12, 8, 10],
+        'Total Fat (g)': [12, 11, 11, 13, 14, 10, 12],
+        'Total Carbohydrate (g)': [30, 28, 29, 31, 32, 27, 30],
+        'Total Vitamin (IU)': [700] * 7,
+        'Total Mineral (mg)': [400, 380, 390, 420, 430, 360, 400],
+    },
+    "9 months": {
+        'Early Morning': ['Breast Milk / Formula Milk'] * 7,
+        'Breakfast': ['Steamed Dosa', 'Kheer (Sooji)', 'Soft-Fluffy Idlis', 'Oats Pancakes', 'Rice Cereal', 'Wheat Kheer', 'Mashed Banana Pancakes'],
+        'Mid-Morning Snack': ['Veg Soup', 'Boiled Egg', 'Mashed Pears', 'Breadsticks', 'Pumpkin Rava Sticks', 'Yoghurt', 'Blueberries/Cherries'],
+        'Lunch': ['Plain Pongal', 'Carrot Khichdi', 'Small pieces of Roti/Phulka with Paneer', 'Plain Ghee Rice', 'Flavoured Rice', 'Vegetable Khichdi', 'Tomato Khichdi/Vegetable Rice'],
+        'Afternoon': ['Breast Milk/Formula Milk'] * 7,
+        'Evening Snack': ['Apple Fingers', 'Grape', 'Papaya', 'Chickoo Mash', 'Carrot Fingers', 'Frozen Banana', 'Sweet Potato Fingers'],
+        'Dinner': ['Homemade Cereal', 'Plain Khichdi', 'Wheat Almond Porridge', 'Ragi Porridge', 'Oats Apple Porridge', 'Chicken Soup', 'Brown Rice Cereal'],
+        'Late Night': ['Breast Milk/Formula Milk'] * 7,
+        'Total Calorie (kcal)': [250, 220, 240, 260, 270, 230, 250],
+        'Total Protein (g)': [11, 10, 11, 12, 13, 10, 11],
+        'Total Fat (g)': [13, 12, 12, 14, 15, 11, 13],
+        'Total Carbohydrate (g)': [32, 30, 31, 33, 34, 29, 32],
+        'Total Vitamin (IU)': [750] * 7,
+        'Total Mineral (mg)': [420, 400, 410, 430, 440, 390, 420],
+    },
+    "10 months": {
+        'Early Morning': ['Breast Milk / Formula Milk'] * 7,
+        'Breakfast': ['Cereal with Grated Apple', 'Oatmeal Porridge with Banana', 'Egg Yolks with Toast', 'Dalia Porridge', 'Paneer Burji Sandwich', 'French Toast', 'Ragi Porridge with Steamed Apples'],
+        'Mid-Morning': ['Cut Papaya', 'Banana Slices', 'Grapes', 'Rusk', 'Cut Melon', 'Steamed Carrots', 'Steamed Apples'],
+        'Lunch': ['Rice with Chicken Broth', 'Vegetables, Rice and Grilled Fish', 'Vegetables, Pulao with Curd', 'Chapatti with Vegetables', 'Rice and Pumpkin Curry', 'Chapatti with Sambar and Vegetables', 'Idly with Sambar'],
+        'Afternoon': ['Breast Milk or Formula Milk'] * 7,
+        'Dinner': ['Dosa with Sambar', 'Chicken Soup and Toast', 'Chapatti with Vegetables', 'Rice and Steamed Fish', 'Chapatti with Vegetables and Curd', 'Rice with Moong Dal Khichdi', 'Mashed Potato with Spinach'],
+        'Late Night': ['Breast Milk or Formula Milk'] * 7,
+        'Total Calorie (kcal)': [300, 320, 280, 330, 310, 340, 290],
+        'Total Protein (g)': [14, 13, 12, 15, 14, 16, 11],
+        'Total Fat (g)': [15, 16, 14, 17, 13, 18, 12],
+        'Total Carbohydrate (g)': [40, 38, 35, 42, 39, 44, 36],
+        'Total Vitamin (IU)': [800] * 7,
+        'Total Mineral (mg)': [450, 430, 410, 460, 440, 470, 400],
+    },
+    "11 months": {
+        'Early Morning': ['Breast Milk / Formula Milk'] * 7,
+        'Breakfast': ['Whole Wheat Pancakes', 'Rice Pudding with Berries', 'Scrambled Eggs with Spinach', 'Barley Porridge', 'Vegetable Wrap', 'Cheese Sandwich', 'Quinoa Upma'],
+        'Mid-Morning': ['Pineapple Chunks', 'Apple Slices', 'Orange Segments', 'Walnuts', 'Cucumber Sticks', 'Cherry Tomatoes', 'Blueberries'],
+        'Lunch': ['Vegetable Biryani with Raita', 'Quinoa Salad with Grilled Chicken', 'Brown Rice and Lentil Stew', 'Chapatti with Mixed Vegetable Curry', 'Mushroom and Spinach Quesadilla', 'Dal Tadka with Brown Rice', 'Vegetable Stir-fry with Tofu'],
+        'Afternoon': ['Breast Milk or Formula Milk'] * 7,
+        'Dinner': ['Vegetable Paratha with Yogurt', 'Salmon Teriyaki with Brown Rice', 'Whole Wheat Pasta with Tomato Sauce', 'Paneer Tikka with Roti', 'Grilled Fish Tacos', 'Lentil Soup with Quinoa', 'Sweet Potato and Chickpea Curry'],
+        'Late Night': ['Breast Milk or Formula Milk'] * 7,
+        'Total Calorie (kcal)': [310, 330, 290, 340, 320, 350, 300],
+        'Total Protein (g)': [15, 14, 13, 16, 15, 17, 12],
+        'Total Fat (g)': [16, 17, 15, 18, 14, 19, 13],
+        'Total Carbohydrate (g)': [42, 40, 37, 44, 41, 46, 38],
+        'Total Vitamin (IU)': [820] * 7,
+        'Total Mineral (mg)': [460, 440, 420, 470, 450, 480, 410],
+    },
+    "12 months": {
+        'Early Morning': ['Breast Milk / Formula Milk'] * 7,
+        'Breakfast': ['Egg and Spinach Breakfast Wrap', 'Quinoa Porridge with Mixed Berries', 'Vegetable Omelette with Whole Grain Toast', 'Millet Porridge with Almonds', 'Tomato and Avocado Sandwich', 'Whole Wheat Pasta Salad with Grilled Chicken', 'Brown Rice Upma'],
+        'Mid-Morning': ['Orange Segments', 'Kiwi Slices', 'Mixed Nuts (Almonds, Walnuts)', 'Greek Yogurt with Berries', 'Carrot Sticks with Hummus', 'Cottage Cheese Cubes', 'Pomegranate Seeds'],
+        'Lunch': ['Baked Salmon with Quinoa Pilaf', 'Vegetable and Chickpea Salad', 'Barley and Lentil Soup', 'Chapatti with Palak Paneer', 'Grilled Shrimp Tacos with Whole Wheat Tortillas', 'Vegetarian Bolognese with Whole Wheat Spaghetti', 'Stir-Fried Tofu with Brown Rice'],
+        'Afternoon': ['Breast Milk or Formula Milk'] * 7,
+        'Dinner': ['Spinach and Cheese Stuffed Paratha with Raita', 'Grilled Chicken Breast with Sweet Potato Mash', 'Whole Wheat Spaghetti with Tomato-Basil Sauce', 'Paneer Bhurji with Roti', 'Quinoa and Black Bean Bowl', 'Dal Makhani with Brown Rice', 'Chickpea and Vegetable Curry with Quinoa'],
+        'Late Night': ['Breast Milk or Formula Milk'] * 7,
+        'Total Calorie (kcal)': [320, 340, 300, 350, 330, 360, 310],
+        'Total Protein (g)': [16, 15, 14, 17, 16, 18, 13],
+        'Total Fat (g)': [17, 18, 16, 19, 15, 20, 14],
+        'Total Carbohydrate (g)': [44, 42, 39, 46, 43, 48, 40],
+        'Total Vitamin (IU)': [830] * 7,
+        'Total Mineral (mg)': [470, 450, 430, 480, 460, 490, 420],
+    },
+}
+
+
+# Function to freeze the plan data so it can be shared safely between sessions
+def _freeze(plan_data):
+    frozen = {}
+    for month, columns in plan_data.items():
+        for column, values in columns.items():
+            if len(values) != len(WEEK_DAYS):
+                raise ValueError(f"{month}: '{column}' has {len(values)} values, expected {len(WEEK_DAYS)}")
+        missing = [column for column in NUTRIENT_COLUMNS if column not in columns]
+        if missing:
+            raise ValueError(f"{month}: missing nutrient columns {missing}")
+        frozen[month] = MappingProxyType({column: tuple(values) for column, values in columns.items()})
+    return MappingProxyType(frozen)
+
+
+INFANT_PLANS = _freeze(_PLAN_DATA)
+INFANT_MONTHS = tuple(INFANT_PLANS)
+del _PLAN_DATA
+
+
+# Function to get the meal columns of a month's plan, in display order
+def meal_columns(month):
+    return [column for column in INFANT_PLANS[month] if column not in NUTRIENT_COLUMNS]
+
+
+# Function to build (once per month) the plan frame for a baby below 1 year
+@functools.lru_cache(maxsize=None)
+def infant_plan_frame(month):
+    if month not in INFANT_PLANS:
+        raise KeyError(f"No infant diet plan for age {month!r}; expected one of {', '.join(INFANT_MONTHS)}")
+    columns = INFANT_PLANS[month]
+    data = {DAY_COLUMN: list(WEEK_DAYS)}
+    for column in meal_columns(month):
+        data[column] = list(columns[column])
+    for column in NUTRIENT_COLUMNS:
+        data[column] = list(columns[column])
+    return pd.DataFrame(data)
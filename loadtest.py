@@ -0,0 +1,408 @@
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlencode
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+NEWS_FIXTURE = os.path.join(BASE_DIR, "fixtures", "news_everything.json")
+DEFAULT_SESSIONS = (1, 5, 10)
+DEFAULT_ITERATIONS = 3
+DEFAULT_TIMEOUT = 120
+STARTUP_TIMEOUT = 60
+
+# The load is run against a real `streamlit run` server: every simulated user is a headless websocket
+# client speaking the same protocol as the browser, so reruns go through the server's own session and
+# script-runner threads and share its caches. The served script renders one sidebar page, chosen with
+# ?page=, because the login gate and the option_menu sidebar are custom components a client cannot drive
+# without a browser.
+DRIVER_SCRIPT = """
+import sys
+sys.path.insert(0, {base_dir!r})
+import streamlit as st
+import app
+app.render_page(st.query_params.get("page", "🏠 Home"))
+"""
+
+# Flows: name -> (sidebar label, steps); each step sets widgets, found by kind and position, in order
+# (a step with no widgets just loads the page)
+FLOWS = {
+    "diet": (" 🍏 Diet Recommendation", [
+        ("open", []),
+        ("infant plan", [("button", 0, True)]),
+        ("age 1-5", [("radio", 0, "1-5")]),
+        ("toddler plan", [("number_input", 0, 95.0), ("number_input", 1, 14.0), ("button", 0, True)]),
+    ]),
+    "bmi": (" 💪 BMI Calculator", [
+        ("open", []),
+        ("calculate", [("number_input", 0, 100.0), ("number_input", 1, 16.0), ("button", 0, True)]),
+    ]),
+    "news": (" 📰 Diet News Articles", [
+        ("open", []),
+        ("page 2", [("number_input", 0, 2)]),
+        ("page 3", [("number_input", 0, 3)]),
+    ]),
+}
+
+
+# Function to start a local stand-in for the News API that serves a recorded response
+def start_stub_news_api(fixture_path=NEWS_FIXTURE, latency=0.0):
+    with open(fixture_path, "rb") as fh:
+        body = fh.read()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, name="stub-news-api", daemon=True).start()
+    return server
+
+
+# Function to pick a free local TCP port
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# Function to start a headless Streamlit server for the driver script; returns (process, port)
+def start_app_server(workdir, env, port=None):
+    port = port or free_port()
+    driver = os.path.join(workdir, "loadtest_driver.py")
+    with open(driver, "w", encoding="utf-8") as fh:
+        fh.write(DRIVER_SCRIPT.format(base_dir=BASE_DIR))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", driver, "--server.headless", "true",
+         "--server.port", str(port), "--server.address", "127.0.0.1", "--server.fileWatcherType", "none",
+         "--browser.gatherUsageStats", "false"],
+        cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Streamlit server exited:\n{process.stderr.read()[-2000:]}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return process, port
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"Streamlit server did not become healthy within {STARTUP_TIMEOUT}s")
+
+
+class Session:
+    # One simulated browser tab: a websocket connection plus the widget values it has set
+    def __init__(self, port, label, timeout=DEFAULT_TIMEOUT):
+        from websockets.sync.client import connect
+        self.query_string = urlencode({"page": label})
+        self.timeout = timeout
+        # (kind, proto, fragment id) for every widget on the page, in page order
+        self.widgets = []
+        self.states = {}
+        self.full_runs = 0
+        self.fragment_runs = 0
+        self._stack = ExitStack()
+        self.ws = self._stack.enter_context(connect(f"ws://127.0.0.1:{port}/_stcore/stream",
+                                                    subprotocols=["streamlit"], max_size=None,
+                                                    open_timeout=timeout))
+
+    # Function to find a widget from the last run by kind and position (e.g. the second number_input);
+    # returns (proto, fragment id)
+    def widget(self, kind, index):
+        matches = [(proto, fragment_id) for element_kind, proto, fragment_id in self.widgets if element_kind == kind]
+        if index >= len(matches):
+            raise LookupError(f"no {kind} #{index} on the page ({len(matches)} found)")
+        return matches[index]
+
+    # Function to set a widget's value, encoded the way the browser sends it. Like the browser, a change
+    # reruns straight away unless the widget sits in a form (held until the form is submitted); a widget
+    # inside a fragment reruns only that fragment. Returns the seconds the rerun took, or None if it was held
+    def set(self, kind, index, value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+        proto, fragment_id = self.widget(kind, index)
+        state = WidgetState(id=proto.id)
+        if kind == "button":
+            state.trigger_value = bool(value)
+        elif kind == "number_input":
+            state.double_value = float(value)
+        else:
+            state.string_value = str(value)
+        self.states[state.id] = state
+        if getattr(proto, "form_id", "") and kind != "button":
+            return None
+        return self.rerun(fragment_id)
+
+    # Function to rerun the script (or one fragment of it) with the current widget values; returns
+    # seconds until it finished
+    def rerun(self, fragment_id=""):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        message = BackMsg()
+        message.rerun_script.query_string = self.query_string
+        message.rerun_script.widget_states.widgets.extend(self.states.values())
+        if fragment_id:
+            message.rerun_script.fragment_id = fragment_id
+        widgets, errors = [], []
+        start = time.perf_counter()
+        self.ws.send(message.SerializeToString())
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(self.ws.recv(timeout=self.timeout))
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                element_kind = element.WhichOneof("type")
+                if element_kind == "exception":
+                    errors.append(element.exception.message)
+                elif hasattr(getattr(element, element_kind), "id"):
+                    widgets.append((element_kind, getattr(element, element_kind), forward.delta.fragment_id))
+            elif kind == "script_finished":
+                partial = forward.script_finished == ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY
+                break
+        elapsed = time.perf_counter() - start
+        # Buttons are triggers: they fire for one run only
+        self.states = {key: state for key, state in self.states.items() if state.WhichOneof("value") != "trigger_value"}
+        if partial:
+            # Only the fragment was redrawn: swap its widgets in where they were
+            first = next((i for i, entry in enumerate(self.widgets) if entry[2] == fragment_id), len(self.widgets))
+            rest = [entry for entry in self.widgets if entry[2] != fragment_id]
+            before = sum(1 for entry in self.widgets[:first] if entry[2] != fragment_id)
+            self.widgets = rest[:before] + widgets + rest[before:]
+            self.fragment_runs += 1
+        else:
+            self.widgets = widgets
+            self.full_runs += 1
+        if errors:
+            raise RuntimeError(errors[0])
+        return elapsed
+
+    def close(self):
+        self._stack.close()
+
+
+# Function to run one flow in a new session; returns the open session and (step, seconds) pairs, one per
+# rerun the step caused
+def run_flow(port, flow, timeout=DEFAULT_TIMEOUT):
+    label, steps = FLOWS[flow]
+    session = Session(port, label, timeout)
+    timings = []
+    try:
+        for step, changes in steps:
+            try:
+                if not changes:
+                    timings.append((step, session.rerun()))
+                for kind, index, value in changes:
+                    seconds = session.set(kind, index, value)
+                    if seconds is not None:
+                        timings.append((step, seconds))
+            except Exception as exc:
+                raise RuntimeError(f"{flow}/{step}: {exc}") from exc
+    except Exception:
+        session.close()
+        raise
+    return session, timings
+
+
+# Function to read a process's resident memory in bytes (Linux; None elsewhere)
+def resident_memory(pid):
+    try:
+        with open(f"/proc/{pid}/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+# Function to read a process's total CPU time (user + system) in seconds (Linux; None elsewhere)
+def cpu_seconds(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as fh:
+            fields = fh.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# Function to get the p-th percentile of a list of samples (nearest rank)
+def percentile(samples, p):
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, -(-len(ordered) * p // 100) - 1))
+    return ordered[int(index)]
+
+
+# Function to summarize latency samples in milliseconds
+def latency_summary(samples):
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+# Function to run `sessions` concurrent simulated users against the server, each running every flow
+# `iterations` times
+def run_load(port, server_pid, sessions, flows=tuple(FLOWS), iterations=DEFAULT_ITERATIONS,
+             timeout=DEFAULT_TIMEOUT):
+    start_line = threading.Barrier(sessions)
+    # Sessions stay connected until the level ends so their server-side state is still counted
+    open_sessions = []
+    samples = {}
+    errors = []
+    lock = threading.Lock()
+
+    def user(number):
+        start_line.wait()
+        for iteration in range(iterations):
+            for i in range(len(flows)):
+                # Users start on different flows so every page is under load at once
+                flow = flows[(number + i) % len(flows)]
+                try:
+                    session, timings = run_flow(port, flow, timeout)
+                except Exception as exc:
+                    with lock:
+                        errors.append(f"session {number}: {exc}")
+                    continue
+                with lock:
+                    open_sessions.append(session)
+                    for step, seconds in timings:
+                        samples.setdefault((flow, step), []).append(seconds)
+
+    memory_before = resident_memory(server_pid)
+    cpu_before = cpu_seconds(server_pid)
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix="session") as pool:
+        list(pool.map(user, range(sessions)))
+    wall = time.perf_counter() - wall_start
+    cpu_after = cpu_seconds(server_pid)
+    memory_after = resident_memory(server_pid)
+    fragment_reruns = sum(session.fragment_runs for session in open_sessions)
+    for session in open_sessions:
+        session.close()
+
+    cpu = cpu_after - cpu_before if cpu_before is not None and cpu_after is not None else None
+    memory_known = memory_before is not None and memory_after is not None
+    all_samples = [seconds for values in samples.values() for seconds in values]
+    return {
+        "sessions": sessions,
+        "iterations": iterations,
+        "wall_s": wall,
+        "reruns": len(all_samples),
+        "reruns_per_s": len(all_samples) / wall if wall else 0.0,
+        # Reruns that redrew only a fragment rather than the whole page
+        "fragment_reruns": fragment_reruns,
+        "server_cpu_s": cpu,
+        # Average number of cores the server process kept busy during the run
+        "server_cpu_cores": cpu / wall if cpu is not None and wall else None,
+        "server_rss_mb": memory_after / 2 ** 20 if memory_known else None,
+        "memory_per_session_mb": (memory_after - memory_before) / 2 ** 20 / len(open_sessions)
+        if memory_known and open_sessions else None,
+        "latency": latency_summary(all_samples) if all_samples else None,
+        "steps": {f"{flow}/{step}": latency_summary(values) for (flow, step), values in sorted(samples.items())},
+        "errors": errors,
+    }
+
+
+REPORT_HEADER = (f"{'sessions':>8} {'reruns':>7} {'partial':>7} {'rerun/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+                 f"{'cpu cores':>9} {'MB/session':>10} {'RSS MB':>8} {'errors':>6}\n" + "-" * 104)
+
+
+# Function to format a number for the report, or '-' when it was not measured
+def _cell(value, width, precision):
+    return f"{'-':>{width}}" if value is None else f"{value:>{width}.{precision}f}"
+
+
+# Function to format one concurrency level as a table row
+def format_level(level):
+    latency = level['latency'] or {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+    return (f"{level['sessions']:>8} {level['reruns']:>7} {level['fragment_reruns']:>7} {level['reruns_per_s']:>8.1f} "
+            f"{_cell(latency['p50_ms'], 9, 1)} {_cell(latency['p95_ms'], 9, 1)} {_cell(latency['p99_ms'], 9, 1)} "
+            f"{_cell(level['server_cpu_cores'], 9, 2)} {_cell(level['memory_per_session_mb'], 10, 2)} "
+            f"{_cell(level['server_rss_mb'], 8, 0)} {len(level['errors']):>6}")
+
+
+# Function to format the results of every concurrency level as tables
+def format_report(levels, steps=False):
+    lines = [REPORT_HEADER] + [format_level(level) for level in levels]
+    if steps:
+        for level in levels:
+            lines.append("")
+            lines.append(f"{level['sessions']} sessions, per step:")
+            lines.append(f"{'step':<28} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+            for step, summary in level['steps'].items():
+                lines.append(f"{step:<28} {summary['count']:>6} {summary['p50_ms']:>9.1f} {summary['p95_ms']:>9.1f} "
+                             f"{summary['p99_ms']:>9.1f} {summary['max_ms']:>9.1f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive concurrent simulated sessions through the app's pages "
+                                                 "and report rerun latency, server memory and CPU.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=list(DEFAULT_SESSIONS),
+                        help="concurrency levels to run, in order (default: %(default)s)")
+    parser.add_argument("--flows", nargs="+", choices=list(FLOWS), default=list(FLOWS),
+                        help="flows each session runs (default: all)")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS,
+                        help="times each session runs every flow")
+    parser.add_argument("--news-fixture", default=NEWS_FIXTURE, help="News API response served by the stub")
+    parser.add_argument("--news-latency-ms", type=float, default=50,
+                        help="delay added by the stub News API (default: %(default)s)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds allowed per rerun")
+    parser.add_argument("--steps", action="store_true", help="also report latency per flow step")
+    parser.add_argument("--json", help="write the full results to this file")
+    args = parser.parse_args(argv)
+
+    news_server = start_stub_news_api(args.news_fixture, args.news_latency_ms / 1000)
+    env = dict(os.environ, NEWS_API_URL=f"http://127.0.0.1:{news_server.server_port}/v2")
+    env.setdefault("NEWS_API_KEY", "load-test")
+
+    levels = []
+    with tempfile.TemporaryDirectory() as workdir:
+        process, port = start_app_server(workdir, env)
+        try:
+            # Untimed pass so imports and first-load work are not charged to the first level
+            for flow in args.flows:
+                run_flow(port, flow, args.timeout)[0].close()
+            print(REPORT_HEADER, flush=True)
+            for sessions in args.sessions:
+                levels.append(run_load(port, process.pid, sessions, args.flows, args.iterations, args.timeout))
+                print(format_level(levels[-1]), flush=True)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+            news_server.shutdown()
+
+    print()
+    print(format_report(levels, args.steps))
+    for level in levels:
+        for error in level['errors'][:5]:
+            print(f"error ({level['sessions']} sessions): {error}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(levels, fh, indent=2)
+    return 1 if any(level['errors'] for level in levels) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
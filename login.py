@@ -1,7 +1,11 @@
+import os
 import streamlit as st
-import pandas as pd
 from datetime import datetime
-import os
+from user_store import get_user_store, UserExistsError
+from passwords import PoolBusyError
+
+# Usernames allowed to open the admin page (comma-separated), e.g. APP_ADMIN_USERS=alice,bob
+ADMIN_USERS = {name.strip() for name in os.environ.get("APP_ADMIN_USERS", "").split(",") if name.strip()}
 
 # Define function to create signup form
 def signup():
@@ -11,9 +15,9 @@ def signup():
     password = st.text_input("Password", type="password")
     # Create button to submit signup form
     if st.button("Signup"):
-        # Add code to check if username already exists
-        user_data = pd.read_csv("C:\\Users\\91879\\kiddie\\Diet\\user_data.csv")
-        if (user_data["username"] == username).any():
+        # Check if username already exists (indexed lookup)
+        user_store = get_user_store()
+        if user_store.exists(username):
             st.error("Username already exists. Please choose a different username.")
         else:
             # Add code to validate password
@@ -24,11 +28,16 @@ def signup():
             elif not any(char in "!@#$%^&*()_+-=[]{}|;:,.<>/?`~" for char in password):
                 st.error("Password must contain at least one special character.")
             else:
-                # Add code to save user data to database or file
+                # Append the new user; the unique key catches a signup racing this one
                 signup_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                user_data = pd.DataFrame({"username": [username], "password": [password], "signup_date": [signup_date]})
-                user_data.to_csv("user_data.csv", index=False)
-                st.success("You have successfully signed up")
+                try:
+                    user_store.add_user(username, password, signup_date)
+                except UserExistsError:
+                    st.error("Username already exists. Please choose a different username.")
+                except PoolBusyError:
+                    st.error("The server is busy. Please try again in a moment.")
+                else:
+                    st.success("You have successfully signed up")
 
 # Define function to create login form
 def login():
@@ -38,41 +47,54 @@ def login():
     password = st.text_input("Password", type="password")
     # Create button to submit login form
     if st.button("Login"):
-        # Add code to check user data against database or file
-        user_data = pd.read_csv("user_data.csv")
-        if (user_data["username"] == username).any() and (user_data["password"] == password).any():
+        # Check the password against this username's own row (hashed off the script thread)
+        try:
+            valid = get_user_store().check_credentials(username, password)
+        except PoolBusyError:
+            st.error("The server is busy. Please try again in a moment.")
+            return
+        if valid:
+            # Logging in is just a session state change; app.main() then shows the app pages
             st.session_state.logged_in = True
-            st.success("You have successfully logged in")
-            os.system("streamlit run C:\\Users\\91879\\kiddie\\Diet\\app.py")
+            st.session_state.username = username
+            st.rerun()
         else:
             st.error("Invalid username or password")
 
 # Define function to create logout button
 def logout():
-    st.write("# Logout")
-    # Create button to log out user
-    if st.button("Logout"):
+    # Create sidebar button to log out user
+    if st.sidebar.button("Logout"):
         st.session_state.logged_in = False
-        st.success("You have successfully logged out")
+        st.session_state.username = None
+        st.rerun()
 
-# Define main function
-def main():
-    st.set_page_config(page_title="Login/Signup App")
-    st.title("Welcome to Kiddie Cusine Planner")
-    # Check if user is logged in
+# Function to check whether this session has logged in
+def is_logged_in():
     if "logged_in" not in st.session_state:
         st.session_state.logged_in = False
-    # Create menu with options to login, signup, or logout
-    if not st.session_state.logged_in:
-        menu = ["Login", "Signup"]
-        choice = st.sidebar.selectbox("Select an option", menu)
-        # Show appropriate form based on user's choice
-        if choice == "Login":
-            login()
-        else:
-            signup()
+    return st.session_state.logged_in
+
+# Function to check whether this session is logged in as an admin user
+def is_admin():
+    return is_logged_in() and st.session_state.get("username") in ADMIN_USERS
+
+# Define function to show the login/signup forms for a session that is not logged in
+def auth_page():
+    st.title("Welcome to Kiddie Cusine Planner")
+    # Create menu with options to login or signup
+    menu = ["Login", "Signup"]
+    choice = st.sidebar.selectbox("Select an option", menu)
+    # Show appropriate form based on user's choice
+    if choice == "Login":
+        login()
     else:
-        logout()
+        signup()
+
+# Define main function; the login screen is part of app.py's single app
+def main():
+    import app
+    app.main()
 
 # Call main function
 if __name__ == "__main__":
@@ -0,0 +1,231 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+import requests
+import request_log
+from profiling import profiled, record_cache
+
+# Endpoint and key come from the environment (or st.secrets, see app.py); point
+# NEWS_API_URL at a local stub server to run without the real service
+NEWS_API_URL = os.environ.get("NEWS_API_URL", "https://newsapi.org/v2")
+NEWS_CACHE_TTL = int(os.environ.get("NEWS_CACHE_TTL", 3 * 60 * 60))
+NEWS_CACHE_SIZE = 128
+NEWS_WINDOW_DAYS = 20
+NEWS_PAGE_SIZE = 100
+NEWS_TIMEOUT = 10
+
+DIET_TOPICS = (
+    "Introduction to toddler nutrition",
+    "Healthy meal ideas for toddlers",
+    "Nutrient-rich foods for toddlers",
+    "Feeding tips for picky eaters",
+    "Balanced diet for preschoolers",
+    "Introducing new foods to toddlers",
+    "Snack ideas for young children",
+    "Hydration tips for toddlers",
+    "Portion sizes for young children",
+    "Importance of fruits and vegetables",
+    "Iron-rich foods for toddlers",
+    "Calcium sources for growing children",
+    "Whole grains for toddlers",
+    "Healthy fats for brain development",
+    "Protein sources for young children",
+    "Vitamin D and its importance",
+    "Food allergies in toddlers",
+    "Nutrition during growth spurts",
+    "Role of probiotics in child health",
+    "Tips for healthy eating habits",
+    "Encouraging self-feeding",
+    "Mealtime routines for toddlers",
+    "Healthy snacks on the go",
+    "Limiting sugary foods and beverages",
+    "Dental health and nutrition",
+    "Physical activity for young children",
+    "Eating together as a family",
+    "Healthy screen time habits",
+    "Navigating food advertising targeted at children",
+    "Creating a positive food environment",
+)
+
+
+class NewsApiError(Exception):
+    pass
+
+
+class TTLCache:
+    # Least-recently-used cache whose entries also expire `ttl` seconds after being stored
+    def __init__(self, max_entries, ttl, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Function to get the (from, to) date strings of the search window ending today
+def date_window(now=None, days=NEWS_WINDOW_DAYS):
+    now = now or datetime.now()
+    return ((now - timedelta(days=days)).strftime('%Y-%m-%d'), now.strftime('%Y-%m-%d'))
+
+
+class NewsService:
+    # Cached News API client: results are keyed by (topic, date window) and fetched on worker threads;
+    # background prefetches run on their own workers so a page's fetch never queues behind them
+    def __init__(self, api_key, base_url=NEWS_API_URL, ttl=NEWS_CACHE_TTL, max_entries=NEWS_CACHE_SIZE,
+                 workers=4, prefetch_workers=2, enrich=None):
+        self.api_key = api_key
+        # Optional hook run on each fetched result before it is cached (e.g. sentiment scoring)
+        self.enrich = enrich
+        self.base_url = base_url.rstrip("/")
+        self.cache = TTLCache(max_entries, ttl)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="news-fetch")
+        self._prefetch_pool = ThreadPoolExecutor(max_workers=prefetch_workers, thread_name_prefix="news-prefetch")
+        # Fetches in flight: key -> (future, True when it was queued as a prefetch)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._refresher = None
+        self._stop = threading.Event()
+        self._session = requests.Session()
+
+    # Function to call the `everything` endpoint for one topic and window
+    @profiled("news.fetch")
+    def fetch(self, topic, window):
+        from_date, to_date = window
+        response = self._session.get(f"{self.base_url}/everything", timeout=NEWS_TIMEOUT,
+                                     headers={"X-Api-Key": self.api_key},
+                                     params={"q": topic, "language": "en", "from": from_date, "to": to_date,
+                                             "sortBy": "relevancy", "pageSize": NEWS_PAGE_SIZE})
+        try:
+            payload = response.json()
+        except ValueError:
+            raise NewsApiError(f"News API returned HTTP {response.status_code} with a non-JSON body")
+        if payload.get("status") != "ok":
+            raise NewsApiError(payload.get("message") or f"News API returned HTTP {response.status_code}")
+        return payload
+
+    # Function to fetch a topic into the cache; runs on a worker thread
+    def _load(self, key):
+        try:
+            result = self.fetch(*key)
+            if self.enrich is not None:
+                result = self.enrich(result)
+            self.cache.put(key, result)
+            return result
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    # Function to get a future for a topic's results, sharing any fetch already in flight; an
+    # on-demand request takes over a prefetch of its topic that has not started yet
+    def submit(self, topic, window=None, refresh=False, background=False):
+        key = (topic, window or date_window())
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                future, prefetch = pending
+                if background or not prefetch or not future.cancel():
+                    record_cache("news", True)
+                    return future
+            elif not refresh:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    record_cache("news", True)
+                    return _done_future(cached)
+            if not refresh:
+                record_cache("news", False)
+            future = (self._prefetch_pool if background else self._pool).submit(self._load, key)
+            self._pending[key] = (future, background)
+            return future
+
+    # Function to get a topic's results, from memory when possible; each call is a logged request
+    def get(self, topic, window=None, timeout=NEWS_TIMEOUT * 2):
+        with request_log.timed_event("news", topic=topic) as event:
+            future = self.submit(topic, window)
+            # Answered from memory; a fetch already in flight still makes the caller wait
+            event["cache_hit"] = future.done()
+            result = future.result(timeout=timeout)
+            event["articles"] = result.get("totalResults")
+            return result
+
+    # Function to queue background fetches for every topic that is not already cached
+    def prefetch(self, topics=DIET_TOPICS, refresh=False):
+        return [self.submit(topic, refresh=refresh, background=True) for topic in topics]
+
+    # Function to start a daemon thread that keeps every topic warm
+    def start_refresher(self, topics=DIET_TOPICS, interval=None):
+        with self._lock:
+            if self._refresher is not None:
+                return self._refresher
+            interval = interval or max(self.cache.ttl * 0.9, 1)
+            self._refresher = threading.Thread(target=self._refresh_loop, args=(tuple(topics), interval),
+                                               name="news-refresher", daemon=True)
+            self._refresher.start()
+            return self._refresher
+
+    def _refresh_loop(self, topics, interval):
+        refresh = False
+        while not self._stop.is_set():
+            for future in self.prefetch(topics, refresh=refresh):
+                try:
+                    future.result()
+                except Exception:
+                    # A failed (or taken over) topic is simply fetched again on demand or on the next pass
+                    pass
+            refresh = True
+            self._stop.wait(interval)
+
+    # Function to stop the refresher and worker threads
+    def close(self):
+        self._stop.set()
+        self._pool.shutdown(wait=False)
+        self._prefetch_pool.shutdown(wait=False, cancel_futures=True)
+        self._session.close()
+
+
+# Function to wrap an already-known result as a completed future
+def _done_future(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+# Function to get the process-wide news service for an API key, starting its refresher once
+def get_news_service(api_key, base_url=NEWS_API_URL, prefetch=True, enrich=None):
+    key = (api_key, base_url)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = NewsService(api_key, base_url, enrich=enrich)
+            if prefetch:
+                service.start_refresher()
+            _services[key] = service
+        return service
@@ -0,0 +1,51 @@
+import hashlib
+import threading
+import weakref
+import numpy as np
+from profiling import record_cache
+from plan_store import DAY_COLUMN, NUTRIENT_COLUMNS
+
+# Summaries keyed by id() of the plan frame they describe; entries drop out with the frame
+_summaries = {}
+_lock = threading.Lock()
+
+
+class NutritionSummary:
+    # Read-only nutrient figures for one 7-day plan, one column per entry of NUTRIENT_COLUMNS
+    def __init__(self, days, daily):
+        self.columns = tuple(NUTRIENT_COLUMNS)
+        self.days = days
+        self.daily = daily
+        self.totals = daily.sum(axis=0)
+        self.means = self.totals / len(days) if len(days) else np.zeros(len(self.columns))
+        # Percentage share of the weekly total contributed by each day
+        with np.errstate(divide='ignore', invalid='ignore'):
+            shares = np.where(self.totals > 0, daily / self.totals * 100, 0.0)
+        self.shares = shares
+        # Content key: identical plans share a key, whichever frame they came from
+        digest = hashlib.sha256('|'.join(map(str, days)).encode())
+        digest.update(np.ascontiguousarray(daily).tobytes())
+        self.key = digest.hexdigest()
+        for array in (self.days, self.daily, self.totals, self.means, self.shares):
+            array.setflags(write=False)
+
+
+# Function to compute the nutrition summary of a plan frame
+def summarize_plan(plan):
+    days = plan[DAY_COLUMN].to_numpy(dtype=object)
+    daily = plan[NUTRIENT_COLUMNS].to_numpy(dtype=np.float64)
+    return NutritionSummary(days, daily)
+
+
+# Function to get the nutrition summary of a plan, computed once per plan frame
+def plan_summary(plan):
+    key = id(plan)
+    entry = _summaries.get(key)
+    if entry is not None and entry[0]() is plan:
+        record_cache("nutrition_summary", True)
+        return entry[1]
+    record_cache("nutrition_summary", False)
+    summary = summarize_plan(plan)
+    with _lock:
+        _summaries[key] = (weakref.ref(plan, lambda _, key=key: _summaries.pop(key, None)), summary)
+    return summary
@@ -0,0 +1,160 @@
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# scrypt cost; raise N as hardware allows (memory used is about 128 * N * R bytes per hash)
+SCRYPT_N = int(os.environ.get("PASSWORD_SCRYPT_N", 2 ** 14))
+SCRYPT_R = int(os.environ.get("PASSWORD_SCRYPT_R", 8))
+SCRYPT_P = int(os.environ.get("PASSWORD_SCRYPT_P", 1))
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+# Verification pool: at most VERIFY_WORKERS hashes run at once and VERIFY_QUEUE more may wait
+VERIFY_WORKERS = int(os.environ.get("PASSWORD_VERIFY_WORKERS", 2))
+VERIFY_QUEUE = int(os.environ.get("PASSWORD_VERIFY_QUEUE", 16))
+VERIFY_TIMEOUT = 10
+
+HASH_PREFIXES = ("scrypt$", "pbkdf2_sha256$")
+
+
+class PoolBusyError(Exception):
+    pass
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+# Function to run scrypt with enough memory headroom for the chosen cost
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r * p, dklen=HASH_BYTES)
+
+
+# Function to hash a password with a fresh salt: "scrypt$n$r$p$salt$hash"
+def hash_password(password, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+    salt = os.urandom(SALT_BYTES)
+    return f"scrypt${n}${r}${p}${_b64(salt)}${_b64(_scrypt(password, salt, n, r, p))}"
+
+
+# Function to check a password against a stored hash in constant time; a malformed or unknown
+# stored hash (bad fields, base64 or scrypt parameters) is a failed check
+def verify_password(password, stored):
+    algorithm, _, params = stored.partition("$")
+    try:
+        if algorithm == "scrypt":
+            n, r, p, salt, expected = params.split("$")
+            actual = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+        elif algorithm == "pbkdf2_sha256":
+            iterations, salt, expected = params.split("$")
+            actual = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), base64.b64decode(salt),
+                                         int(iterations))
+        else:
+            return False
+        # binascii.Error from b64decode is a ValueError too
+        return hmac.compare_digest(actual, base64.b64decode(expected))
+    except ValueError:
+        return False
+
+
+# Function to tell a stored hash from a legacy plaintext password
+def is_hashed(stored):
+    return stored.startswith(HASH_PREFIXES)
+
+
+class VerificationPool:
+    # Bounded thread pool for password hashing; rejects work instead of queueing without limit
+    def __init__(self, workers=VERIFY_WORKERS, queue_size=VERIFY_QUEUE):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-verify")
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        # Stand-in hash so unknown usernames cost as much to reject as wrong passwords: made once,
+        # by the first job on the pool, never on a script thread
+        self._dummy_hash = self._executor.submit(hash_password, "dummy-password")
+
+    # Function to run one job, recording how long it took from submission
+    def _run(self, submitted_at, func, args):
+        try:
+            return func(*args)
+        finally:
+            latency = time.monotonic() - submitted_at
+            with self._lock:
+                self.completed += 1
+                self.total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+            self._slots.release()
+
+    # Function to run a hashing job on the pool and wait for its result; a job that takes longer than
+    # `timeout` is reported like a full pool (it still finishes in the background)
+    def call(self, func, *args, wait=0.5, timeout=VERIFY_TIMEOUT):
+        if not self._slots.acquire(timeout=wait):
+            with self._lock:
+                self.rejected += 1
+            raise PoolBusyError("Too many password checks in progress")
+        with self._lock:
+            self.submitted += 1
+        try:
+            future = self._executor.submit(self._run, time.monotonic(), func, args)
+        except BaseException:
+            self._slots.release()
+            raise
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            with self._lock:
+                self.timed_out += 1
+            raise PoolBusyError("Password check timed out")
+
+    # Function to check a password (None stored hash means the user does not exist)
+    def verify(self, password, stored):
+        if stored is None:
+            self.call(self._verify_unknown, password)
+            return False
+        return self.call(verify_password, password, stored)
+
+    # Function to check a password against the stand-in hash (runs on the pool, behind the job making it)
+    def _verify_unknown(self, password):
+        return verify_password(password, self._dummy_hash.result())
+
+    # Function to hash a new password on the pool
+    def hash(self, password):
+        return self.call(hash_password, password)
+
+    # Function to get throughput and latency counters
+    def stats(self):
+        with self._lock:
+            elapsed = time.monotonic() - self._started
+            return {
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "in_flight": self.submitted - self.completed,
+                "throughput_per_s": self.completed / elapsed if elapsed else 0.0,
+                "mean_latency_s": self.total_latency / self.completed if self.completed else 0.0,
+                "max_latency_s": self.max_latency,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# Function to get the process-wide verification pool
+def get_verification_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = VerificationPool()
+        return _pool
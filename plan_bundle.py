@@ -0,0 +1,329 @@
+import argparse
+import gzip
+import hashlib
+import itertools
+import json
+import os
+import sys
+import threading
+import warnings
+from datetime import datetime, timezone
+import plan_store
+from plan_store import PLAN_KEY_COLUMNS, DAY_COLUMN, MEAL_COLUMNS, NUTRIENT_COLUMNS
+from profiling import record_cache
+
+# Every answer the diet page can give is compiled ahead of time into one bundle: the plan rows,
+# nutrition totals and chart specs of each (age, gender, meal type, BMI category) profile and of
+# each infant month. Compile after editing years.xlsx (or changing the chart code):
+#   python plan_bundle.py compile [--workbook years.xlsx] [--output build/plan_bundle.json.gz]
+# When a bundle is deployed the app and API answer from it; without one they fall back to
+# filtering the workbook and building figures per process. A bundle is only used while both the
+# workbook and the code in COMPILED_BY match what it was compiled from.
+
+# Bumped whenever the bundle layout changes; bundles of another format are ignored
+BUNDLE_FORMAT = 1
+BUNDLE_PATH = os.environ.get("PLAN_BUNDLE", os.path.join(plan_store.BASE_DIR, "build", "plan_bundle.json.gz"))
+
+# The profiles the app can ask for
+PROFILE_AGES = (1, 2, 3, 4, 5)
+PROFILE_GENDERS = ('Male', 'Female')
+PROFILE_MEAL_TYPES = ('Veg', 'Non-Veg')
+PROFILE_BMI_CATEGORIES = ('Underweight', 'Normal weight', 'Overweight')
+PLAN_DAYS = 7
+
+# Modules whose code shapes the compiled content (lookups, infant plans, records, nutrition, chart
+# specs); a bundle compiled by other versions of them is ignored
+COMPILED_BY = ("plan_store.py", "infant_plans.py", "core.py", "nutrition.py", "charts.py", "plan_bundle.py")
+
+# Charts drawn for each kind of plan (see charts.CHART_BUILDERS)
+PROFILE_CHARTS = ('nutrition_pie', 'total_nutrition_bar')
+INFANT_CHARTS = ('nutrition_pie', 'nutrition_bar')
+
+# One loaded bundle per path, shared by every session in this process
+_bundles = {}
+_lock = threading.Lock()
+_code_digest = None
+
+
+class WorkbookSchemaError(ValueError):
+    pass
+
+
+class CompiledPlan:
+    # One precompiled plan: JSON-ready rows and nutrition and chart specs, plus the plan frame and
+    # nutrition summary the page draws from
+    def __init__(self, entry):
+        import pandas as pd
+        from nutrition import summarize_plan
+        self.columns = entry['columns']
+        self.records = entry['plan']
+        self.nutrition = entry['nutrition']
+        self.key = entry['key']
+        self.charts = entry['charts']
+        self.frame = pd.DataFrame.from_records(self.records, columns=self.columns + NUTRIENT_COLUMNS)
+        self.summary = summarize_plan(self.frame)
+
+
+class PlanBundle:
+    # A loaded bundle: compiled plans by (age, gender, meal type, BMI category) and by infant month;
+    # each plan's frame is made on first lookup and then reused
+    def __init__(self, path, stamp, payload):
+        self.path = path
+        self.stamp = stamp
+        self.version = payload['version']
+        self.source = payload['source']
+        self.compiled_at = payload['compiled_at']
+        self._entries = {_parse_profile_key(key): entry for key, entry in payload['plans'].items()}
+        self._entries.update(payload['infant_plans'])
+        self._plans = {}
+
+    # Function to get a compiled plan by profile tuple or infant month (None when not compiled)
+    def _lookup(self, key):
+        compiled = self._plans.get(key)
+        if compiled is None:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            compiled = self._plans.setdefault(key, CompiledPlan(entry))
+        return compiled
+
+    # Function to get the compiled plan of a profile (None outside the compiled profiles)
+    def plan(self, age, gender, meal_type, bmi_category):
+        return self._lookup((age, gender, meal_type, bmi_category))
+
+    # Function to get the compiled plan of an infant month (None for an unknown month)
+    def infant_plan(self, month):
+        return self._lookup(month)
+
+    # Function to get every chart spec in the bundle, as {(chart kind, plan key): spec}
+    def chart_specs(self):
+        return {(kind, entry['key']): spec for entry in self._entries.values()
+                for kind, spec in entry['charts'].items()}
+
+
+# Function to get the bundle key of a profile
+def _profile_key(age, gender, meal_type, bmi_category):
+    return f"{age}|{gender}|{meal_type}|{bmi_category}"
+
+
+# Function to parse a bundle key back into a profile
+def _parse_profile_key(key):
+    age, gender, meal_type, bmi_category = key.split("|")
+    return int(age), gender, meal_type, bmi_category
+
+
+# Function to list every profile the app can ask for
+def all_profiles():
+    return list(itertools.product(PROFILE_AGES, PROFILE_GENDERS, PROFILE_MEAL_TYPES, PROFILE_BMI_CATEGORIES))
+
+
+# Function to check a workbook frame against the expected schema. Layout problems (missing
+# columns, non-integer or negative nutrients) raise WorkbookSchemaError; content problems that
+# leave rows or profiles unreachable are returned as warnings
+def validate_workbook(df):
+    from infant_plans import WEEK_DAYS
+    errors, problems = [], []
+    missing = [column for column in PLAN_KEY_COLUMNS + [DAY_COLUMN] + MEAL_COLUMNS + NUTRIENT_COLUMNS
+               if column not in df.columns]
+    if missing:
+        errors.append(f"missing column(s): {', '.join(missing)}")
+    for column in NUTRIENT_COLUMNS:
+        if column not in df.columns:
+            continue
+        if df[column].dtype.kind not in "iu":
+            errors.append(f"'{column}' must hold whole numbers in every row (found {df[column].dtype})")
+        elif (df[column] < 0).any():
+            errors.append(f"'{column}' has {int((df[column] < 0).sum())} negative value(s)")
+    if errors:
+        raise WorkbookSchemaError("Workbook does not match the plan schema: " + "; ".join(errors))
+
+    domains = {'Age': PROFILE_AGES, 'Gender': PROFILE_GENDERS, 'Type of Meal': PROFILE_MEAL_TYPES,
+               'BMI': PROFILE_BMI_CATEGORIES, DAY_COLUMN: WEEK_DAYS}
+    for column, allowed in domains.items():
+        outside = df[column][~df[column].isin(allowed)]
+        if len(outside):
+            values = ", ".join(sorted({repr(value) for value in outside.tolist()}))
+            problems.append(f"{len(outside)} row(s) with '{column}' outside {list(allowed)}: {values}")
+    for column in [DAY_COLUMN] + MEAL_COLUMNS:
+        empty = int(df[column].isna().sum())
+        if empty:
+            problems.append(f"{empty} row(s) with no '{column}'")
+    sizes = df.groupby(PLAN_KEY_COLUMNS, sort=False).size()
+    for profile in all_profiles():
+        days = int(sizes.get(profile, 0))
+        if days == 0:
+            problems.append(f"no plan for {_profile_key(*profile)}")
+        elif days != PLAN_DAYS:
+            problems.append(f"plan for {_profile_key(*profile)} has {days} row(s), expected {PLAN_DAYS}")
+    return problems
+
+
+# Function to compile one plan: its rows, nutrition totals, content key and chart specs
+def _compile_plan(plan, columns, chart_kinds):
+    import plotly.io as pio
+    from charts import CHART_BUILDERS
+    from core import plan_records, nutrition_dict
+    from nutrition import summarize_plan
+    summary = summarize_plan(plan)
+    return {
+        "columns": columns,
+        "plan": plan_records(plan, columns + NUTRIENT_COLUMNS),
+        "nutrition": nutrition_dict(summary),
+        "key": summary.key,
+        "charts": {kind: json.loads(pio.to_json(CHART_BUILDERS[kind](summary), validate=False))
+                   for kind in chart_kinds},
+    }
+
+
+# Function to compile every profile's plan and every infant month into a bundle file; returns
+# (bundle version, content warnings). The workbook is parsed and looked up exactly as at runtime
+def compile_bundle(excel_path=plan_store.EXCEL_PATH, output_path=BUNDLE_PATH, strict=False):
+    import pandas as pd
+    from infant_plans import INFANT_MONTHS, infant_plan_frame, meal_columns
+    path = os.path.abspath(excel_path)
+    df = pd.read_excel(path)
+    problems = validate_workbook(df)
+    if strict and problems:
+        raise WorkbookSchemaError(f"{path} has {len(problems)} problem(s):\n" + "\n".join(problems))
+
+    digest = plan_store._content_digest(path)
+    snapshot = plan_store.PlanSnapshot(path, None, digest,
+                                       plan_store.contiguous_plans(plan_store.compact_plan_frame(df)))
+    profile_columns = [DAY_COLUMN] + MEAL_COLUMNS
+    plans = {_profile_key(*profile): _compile_plan(snapshot.lookup(*profile), profile_columns, PROFILE_CHARTS)
+             for profile in all_profiles()}
+    infant_plans = {month: _compile_plan(infant_plan_frame(month), [DAY_COLUMN] + meal_columns(month),
+                                         INFANT_CHARTS)
+                    for month in INFANT_MONTHS}
+    content = {"plans": plans, "infant_plans": infant_plans}
+    # The version changes exactly when the compiled content does
+    version = hashlib.sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    payload = {
+        "format": BUNDLE_FORMAT,
+        "version": version,
+        "compiled_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "source": {"workbook": os.path.basename(path), "sha256": digest, "code_sha256": code_digest()},
+        **content,
+    }
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as fh:
+        json.dump(payload, fh, separators=(",", ":"))
+    os.replace(tmp_path, output_path)
+    return version, problems
+
+
+# Function to hash the code the compiled content depends on (COMPILED_BY and the plotly version that
+# serialized the chart specs), once per process
+def code_digest():
+    global _code_digest
+    if _code_digest is None:
+        import plotly
+        sha = hashlib.sha256(plotly.__version__.encode("utf-8"))
+        for name in COMPILED_BY:
+            with open(os.path.join(plan_store.BASE_DIR, name), "rb") as fh:
+                sha.update(name.encode("utf-8") + b"\0" + fh.read())
+        _code_digest = sha.hexdigest()
+    return _code_digest
+
+
+# Function to check that a bundle was compiled by the current code from the current version of the
+# workbook (warns when not)
+def _matches_sources(path, source, excel_path):
+    if source.get("code_sha256") != code_digest():
+        warnings.warn(f"Ignoring plan bundle {path}: the plan, nutrition or chart code changed since it was compiled")
+        return False
+    if os.path.exists(excel_path) and plan_store._content_digest(excel_path) != source["sha256"]:
+        warnings.warn(f"Ignoring plan bundle {path}: {excel_path} changed since it was compiled")
+        return False
+    return True
+
+
+# Function to read a bundle file, or None when it is of another format or was compiled from a
+# different version of the workbook
+def _read_bundle(path, stamp, excel_path):
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        payload = json.load(fh)
+    if payload.get("format") != BUNDLE_FORMAT:
+        warnings.warn(f"Ignoring plan bundle {path}: format {payload.get('format')}, expected {BUNDLE_FORMAT}")
+        return None
+    if not _matches_sources(path, payload["source"], excel_path):
+        return None
+    return PlanBundle(path, stamp, payload)
+
+
+# Function to get a cheap change stamp for the workbook (None when it is missing)
+def _workbook_stamp(excel_path):
+    try:
+        return plan_store._file_stamp(excel_path)
+    except OSError:
+        return None
+
+
+# Function to get the deployed bundle (None when there is none), reloading it when the bundle file
+# changes and dropping it when the workbook is edited after it was compiled (the workbook is only
+# hashed when one of the two files changed)
+def get_bundle(path=None, excel_path=plan_store.EXCEL_PATH):
+    path, excel_path = os.path.abspath(path or BUNDLE_PATH), os.path.abspath(excel_path)
+    try:
+        stamp = (plan_store._file_stamp(path), _workbook_stamp(excel_path))
+    except OSError:
+        return None
+    cached = _bundles.get(path)
+    if cached is not None and cached[0] == stamp:
+        record_cache("plan_bundle", True)
+        return cached[1]
+    record_cache("plan_bundle", False)
+    with _lock:
+        cached = _bundles.get(path)
+        if cached is None or cached[0] != stamp:
+            from charts import use_compiled_specs
+            if cached is not None and cached[1] is not None and cached[0][0] == stamp[0]:
+                # Same bundle file, workbook touched: keep the loaded bundle only while it still matches
+                bundle = cached[1] if _matches_sources(path, cached[1].source, excel_path) else None
+            else:
+                bundle = _read_bundle(path, stamp[0], excel_path)
+                if bundle is not None:
+                    use_compiled_specs(bundle.chart_specs())
+            if bundle is None:
+                use_compiled_specs({})
+            cached = _bundles[path] = (stamp, bundle)
+        return cached[1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate years.xlsx and compile every plan, its nutrition "
+                                                 "totals and chart specs into a versioned bundle.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    compile_parser = commands.add_parser("compile", help="validate the workbook and write the bundle")
+    compile_parser.add_argument("--output", default=BUNDLE_PATH, help="bundle file (default: %(default)s)")
+    compile_parser.add_argument("--strict", action="store_true",
+                                help="fail on content warnings (unreachable rows, missing or short plans)")
+    validate_parser = commands.add_parser("validate", help="only check the workbook against the schema")
+    for command_parser in (compile_parser, validate_parser):
+        command_parser.add_argument("--workbook", default=plan_store.EXCEL_PATH,
+                                    help="meal-plan workbook (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "validate":
+            import pandas as pd
+            problems = validate_workbook(pd.read_excel(args.workbook))
+        else:
+            version, problems = compile_bundle(args.workbook, args.output, args.strict)
+    except WorkbookSchemaError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    for problem in problems:
+        print(f"warning: {problem}")
+    if args.command == "compile":
+        print(f"Compiled {len(all_profiles())} profile plans and the infant plans into {args.output} "
+              f"(version {version}, {os.path.getsize(args.output):,} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+import os
+import sys
+import glob
+import hashlib
+import threading
+from contextlib import contextmanager
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as pa_ipc
+from profiling import record_cache
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks (Windows): replicas may each publish the same version once
+    fcntl = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+EXCEL_PATH = os.path.join(BASE_DIR, "years.xlsx")
+CACHE_DIR = os.path.join(BASE_DIR, ".cache")
+
+# Columns that identify one 7-day plan in the workbook
+PLAN_KEY_COLUMNS = ['Age', 'Gender', 'Type of Meal', 'BMI']
+
+# Schema shared by the workbook plans and the infant plans: a 'Day' column,
+# plan-specific meal columns, then the six nutrient totals in this order
+DAY_COLUMN = 'Day'
+MEAL_COLUMNS = ['Breakfast ( 7 AM )', 'Morning Snack ( 10 AM )', 'Lunch ( 12.30 PM)',
+                'Evening Snack ( 4 PM )', 'Dinner ( 7 PM )']
+NUTRIENT_COLUMNS = ['Total Calorie (kcal)', 'Total Protein (g)', 'Total Fat (g)',
+                    'Total Carbohydrate (g)', 'Total Vitamin (IU)', 'Total Mineral (mg)']
+
+# Columns stored as categoricals: few distinct values each, so rows hold small integer codes
+# (dish names are interned once per column) and equality checks compare codes
+CATEGORICAL_COLUMNS = PLAN_KEY_COLUMNS + [DAY_COLUMN] + MEAL_COLUMNS
+
+# Schema metadata key holding the workbook digest a published plan table was built from
+DIGEST_METADATA_KEY = b"plan_store.digest"
+
+# One loaded workbook per path, shared by every Streamlit session in this process
+_snapshots = {}
+_lock = threading.Lock()
+
+
+class PlanSnapshot:
+    # Immutable view of one version of the workbook; `frame` is usually a read-only mapping of the
+    # published plan table (see _read_frame), and callers must not mutate it
+    def __init__(self, path, stamp, digest, frame, index=None):
+        self.path = path
+        self.stamp = stamp
+        self.digest = digest
+        self.frame = frame
+        self.index = index if index is not None else build_plan_index(frame)
+        self.empty = frame.iloc[0:0]
+        # Plan frames handed out so far; each profile's frame is made on first lookup and then reused
+        self._plans = {}
+
+    # Function to get the plan rows for one profile without scanning the frame
+    def lookup(self, age, gender, meal_type, bmi_category):
+        key = (age, gender, meal_type, bmi_category)
+        plan = self._plans.get(key)
+        if plan is None:
+            rows = self.index.get(key)
+            if rows is None:
+                return self.empty
+            plan = self._plans.setdefault(key, self.frame.iloc[rows])
+        return plan
+
+
+# Function to index the frame by profile: the row positions of each profile, as a slice when the
+# rows are contiguous (so the plan is a view of the frame)
+def build_plan_index(df):
+    index = {}
+    for key, positions in df.groupby(PLAN_KEY_COLUMNS, sort=False, observed=True).indices.items():
+        start, stop = int(positions[0]), int(positions[-1]) + 1
+        index[key] = slice(start, stop) if stop - start == len(positions) else positions
+    return index
+
+
+# Function to store the text key, day and meal columns as strings: a number typed into a meal cell
+# is ordinary Excel input, but a category column mixing ints and strings cannot be written to Arrow
+def text_columns(df):
+    df = df.copy()
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns and column != 'Age' and df[column].dtype == object:
+            df[column] = df[column].map(lambda value: value if pd.isna(value) else str(value))
+    return df
+
+
+# Function to convert a plan frame to its compact layout: categorical key, day and meal columns and
+# the smallest integer type that holds each nutrient column
+def compact_plan_frame(df):
+    df = text_columns(df)
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            values = df[column]
+            if values.dtype.kind == "f" and values.dropna().mod(1).eq(0).all():
+                # Whole-number ages: integer categories (a missing age is code -1)
+                values = values.astype("Int64")
+            df[column] = values.astype("category")
+    for column in NUTRIENT_COLUMNS:
+        if column in df.columns and df[column].dtype.kind in "iu":
+            df[column] = pd.to_numeric(df[column], downcast="integer")
+    return df
+
+
+# Function to compare a plan frame's memory use before and after compact_plan_frame, per column
+def memory_report(df):
+    compact = compact_plan_frame(df)
+    before = df.memory_usage(deep=True, index=False)
+    after = compact.memory_usage(deep=True, index=False)
+    return pd.DataFrame({"dtype before": df.dtypes.astype(str), "bytes before": before,
+                         "dtype after": compact.dtypes.astype(str), "bytes after": after})
+
+
+# Function to reorder rows so every profile is one contiguous block (order within a profile is kept)
+def contiguous_plans(df):
+    group_ids = df.groupby(PLAN_KEY_COLUMNS, sort=False, observed=True).ngroup().to_numpy()
+    if (group_ids[1:] >= group_ids[:-1]).all():
+        return df
+    return df.iloc[group_ids.argsort(kind="stable")].reset_index(drop=True)
+
+
+# Function to get a cheap change stamp for a file
+def _file_stamp(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+# Function to hash the workbook contents
+def _content_digest(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 16), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+# Function to get the published plan table path for a workbook version
+def _cache_path(path, digest):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CACHE_DIR, f"{name}-{digest[:16]}.arrow")
+
+
+# Function to hold an exclusive lock while one process publishes a version (no-op without fcntl)
+@contextmanager
+def _publish_lock(cache_path):
+    if fcntl is None:
+        yield
+        return
+    with open(f"{cache_path}.lock", "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+# Function to write a plan frame as an Arrow IPC file, swapped into place atomically
+def _publish_frame(df, cache_path, digest):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), DIGEST_METADATA_KEY: digest.encode()})
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa_ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, cache_path)
+
+
+# Function to map a published plan table into this process without copying it; the pages are
+# shared with every other process mapping the same file
+def _map_frame(cache_path, digest):
+    table = pa_ipc.open_file(pa.memory_map(cache_path, "r")).read_all()
+    if (table.schema.metadata or {}).get(DIGEST_METADATA_KEY) != digest.encode():
+        raise ValueError(f"{cache_path} was not built from workbook version {digest[:16]}")
+    # One block per column keeps numeric columns as read-only views of the mapping and
+    # strings as Arrow-backed arrays over it
+    return table.to_pandas(split_blocks=True)
+
+
+# Function to delete the published tables of other versions of a workbook (processes still
+# mapping one keep their view; where the OS refuses, the file is left for the next publish)
+def _prune_versions(path, keep):
+    name = os.path.splitext(os.path.basename(path))[0]
+    for pattern in (f"{name}-*.arrow", f"{name}-*.arrow.lock", f"{name}-*.pkl"):
+        for old_path in glob.glob(os.path.join(CACHE_DIR, pattern)):
+            if not old_path.startswith(keep):
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    pass
+
+
+# Function to get the frame for a workbook version: mapped from the published table when another
+# process (or an earlier run) built it, otherwise parsed once and published for the others
+def _read_frame(path, digest):
+    cache_path = _cache_path(path, digest)
+    try:
+        return _map_frame(cache_path, digest)
+    except (OSError, ValueError, pa.ArrowException):
+        pass
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with _publish_lock(cache_path):
+            try:
+                # Published by another process while this one waited for the lock
+                return _map_frame(cache_path, digest)
+            except (OSError, ValueError, pa.ArrowException):
+                pass
+            df = contiguous_plans(compact_plan_frame(pd.read_excel(path)))
+            _publish_frame(df, cache_path, digest)
+        _prune_versions(path, keep=cache_path)
+        return _map_frame(cache_path, digest)
+    except (OSError, pa.ArrowException):
+        # A read-only deployment, or a frame Arrow cannot store, still works with a private copy
+        # per process
+        return contiguous_plans(compact_plan_frame(pd.read_excel(path)))
+
+
+# Function to parse and publish the current version of a workbook ahead of starting the servers
+def publish(excel_path=EXCEL_PATH):
+    path = os.path.abspath(excel_path)
+    digest = _content_digest(path)
+    _read_frame(path, digest)
+    return _cache_path(path, digest), digest
+
+
+# Function to get the current snapshot of a workbook, reloading only when it changed
+def get_snapshot(excel_path=EXCEL_PATH):
+    path = os.path.abspath(excel_path)
+    stamp = _file_stamp(path)
+    snapshot = _snapshots.get(path)
+    if snapshot is not None and snapshot.stamp == stamp:
+        record_cache("plan_store", True)
+        return snapshot
+    record_cache("plan_store", False)
+    with _lock:
+        snapshot = _snapshots.get(path)
+        if snapshot is not None and snapshot.stamp == stamp:
+            return snapshot
+        digest = _content_digest(path)
+        if snapshot is not None and snapshot.digest == digest:
+            # Touched but not edited: keep the loaded frame
+            snapshot = PlanSnapshot(path, stamp, digest, snapshot.frame, snapshot.index)
+        else:
+            snapshot = PlanSnapshot(path, stamp, digest, _read_frame(path, digest))
+        _snapshots[path] = snapshot
+        return snapshot
+
+
+# Function to get the shared meal-plan frame (no copy is made)
+def load_plan_frame(excel_path=EXCEL_PATH):
+    return get_snapshot(excel_path).frame
+
+
+# Function to find the loaded snapshot a frame belongs to, if any
+def snapshot_for(df):
+    for snapshot in list(_snapshots.values()):
+        if snapshot.frame is df:
+            return snapshot
+    return None
+
+
+# Function to look up the plan for one profile
+def lookup_plan(age, gender, meal_type, bmi_category, excel_path=EXCEL_PATH):
+    return get_snapshot(excel_path).lookup(age, gender, meal_type, bmi_category)
+
+
+# Function to look up plans for many (age, gender, meal_type, bmi_category) profiles at once
+def lookup_plans(profiles, excel_path=EXCEL_PATH):
+    snapshot = get_snapshot(excel_path)
+    return [snapshot.lookup(*profile) for profile in profiles]
+
+
+if __name__ == "__main__":
+    # python plan_store.py publish [years.xlsx]  |  python plan_store.py memory [years.xlsx]
+    if len(sys.argv) >= 2 and sys.argv[1] == "publish":
+        cache_path, digest = publish(sys.argv[2] if len(sys.argv) > 2 else EXCEL_PATH)
+        print(f"Published version {digest[:16]} to {cache_path}")
+    elif len(sys.argv) >= 2 and sys.argv[1] == "memory":
+        report = memory_report(pd.read_excel(sys.argv[2] if len(sys.argv) > 2 else EXCEL_PATH))
+        print(report.to_string())
+        before, after = report["bytes before"].sum(), report["bytes after"].sum()
+        print(f"\nTotal: {before:,} bytes before, {after:,} bytes after ({after / before:.0%})")
+    else:
+        print("usage: python plan_store.py publish|memory [excel_path]")
+        sys.exit(2)
@@ -0,0 +1,172 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Opt-in: set APP_PROFILE=1 before starting the server. Timings are kept in memory, shown on
+# the hidden admin page (?admin=1) and appended as JSON lines to PROFILE_LOG after each rerun and
+# every FLUSH_INTERVAL seconds by a background thread (API processes, news and report threads and
+# fragment reruns never reach the end of a page render)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ENABLED = os.environ.get("APP_PROFILE", "").lower() in ("1", "true", "yes")
+PROFILE_LOG = os.environ.get("PROFILE_LOG", os.path.join(BASE_DIR, "logs", "profile.jsonl"))
+FLUSH_INTERVAL = float(os.environ.get("PROFILE_FLUSH_INTERVAL", 30))
+# Events waiting for a flush; past this many the oldest are dropped and counted
+MAX_PENDING = int(os.environ.get("PROFILE_MAX_PENDING", 10000))
+
+_timings = {}
+_caches = {}
+_reruns = {}
+_pending = deque(maxlen=MAX_PENDING)
+_dropped = 0
+_flusher = None
+_lock = threading.Lock()
+
+
+# Function to queue one event for the log (caller holds _lock)
+def _queue_event(event):
+    global _dropped
+    if len(_pending) == _pending.maxlen:
+        _dropped += 1
+    _pending.append(event)
+    if _flusher is None:
+        _start_flusher()
+
+
+# Function to start the background flusher once per process (caller holds _lock)
+def _start_flusher():
+    global _flusher
+    _flusher = threading.Thread(target=_flush_loop, name="profile-flusher", daemon=True)
+    _flusher.start()
+    atexit.register(flush)
+
+
+# Function run by the flusher thread: write what has been recorded every FLUSH_INTERVAL seconds
+def _flush_loop():
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        try:
+            flush()
+        except OSError:
+            # Profiling must never take the app down; the events stay dropped
+            pass
+
+
+# Function to record one timed call
+def record_time(name, seconds):
+    with _lock:
+        stats = _timings.get(name)
+        if stats is None:
+            stats = _timings[name] = {"calls": 0, "total_s": 0.0, "max_s": 0.0}
+        stats["calls"] += 1
+        stats["total_s"] += seconds
+        stats["max_s"] = max(stats["max_s"], seconds)
+        _queue_event({"ts": time.time(), "kind": "timing", "name": name, "seconds": seconds})
+
+
+# Function to record cache lookups (no-op unless profiling is enabled)
+def record_cache(name, hit, count=1):
+    if not ENABLED or not count:
+        return
+    with _lock:
+        stats = _caches.get(name)
+        if stats is None:
+            stats = _caches[name] = {"hits": 0, "misses": 0}
+        stats["hits" if hit else "misses"] += count
+        _queue_event({"ts": time.time(), "kind": "cache", "name": name, "hit": hit, "count": count})
+
+
+# Function to count one script run: a full rerun ("script") or a partial one ("fragment:<name>")
+def record_rerun(scope):
+    if not ENABLED:
+        return
+    with _lock:
+        _reruns[scope] = _reruns.get(scope, 0) + 1
+        _queue_event({"ts": time.time(), "kind": "rerun", "name": scope})
+
+
+# Function to time a block of code under a name
+@contextmanager
+def timed(name):
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_time(name, time.perf_counter() - start)
+
+
+# Decorator to time every call of a function; returns the function untouched when profiling is off
+def profiled(name=None):
+    def decorator(func):
+        if not ENABLED:
+            return func
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record_time(label, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+# Function to get a snapshot of the collected timings, cache hit rates and rerun counts
+def snapshot():
+    with _lock:
+        timings = [dict(name=name, mean_ms=stats["total_s"] / stats["calls"] * 1000,
+                        max_ms=stats["max_s"] * 1000, calls=stats["calls"], total_s=stats["total_s"])
+                   for name, stats in _timings.items()]
+        caches = [dict(name=name, hits=stats["hits"], misses=stats["misses"],
+                       hit_rate=stats["hits"] / (stats["hits"] + stats["misses"]))
+                  for name, stats in _caches.items()]
+        reruns = [dict(scope=scope, runs=runs) for scope, runs in sorted(_reruns.items())]
+    timings.sort(key=lambda row: row["total_s"], reverse=True)
+    return timings, caches, reruns
+
+
+# Function to append the events recorded since the last flush to the JSON-lines log, with a
+# "dropped" event counting those lost to the MAX_PENDING cap
+def flush(path=None):
+    global _dropped
+    path = path or PROFILE_LOG
+    with _lock:
+        events = list(_pending)
+        _pending.clear()
+        if _dropped:
+            events.append({"ts": time.time(), "kind": "dropped", "count": _dropped})
+            _dropped = 0
+    if not events:
+        return 0
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as fh:
+        for event in events:
+            fh.write(json.dumps(event) + "\n")
+    return len(events)
+
+
+# Function to get the number of events dropped since the last flush
+def dropped():
+    return _dropped
+
+
+# Function to clear all collected statistics
+def reset():
+    global _dropped
+    with _lock:
+        _timings.clear()
+        _caches.clear()
+        _reruns.clear()
+        _pending.clear()
+        _dropped = 0
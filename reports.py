@@ -0,0 +1,141 @@
+import hashlib
+import io
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from bmi_measures import BMI_MEASURES
+from profiling import profiled, record_cache
+
+# Rendered PDFs keyed by (category, content hash); each one is built once per process
+_pdf_cache = {}
+_lock = threading.Lock()
+
+
+# Function to render a titled list of measures to PDF bytes
+@profiled("reports.render_measures_pdf")
+def render_measures_pdf(title, measures):
+    pdf_bytes = io.BytesIO()
+    doc = SimpleDocTemplate(pdf_bytes, pagesize=letter)
+    styles = getSampleStyleSheet()
+    story = [Paragraph(title, styles['Title'])]
+    for measure in measures:
+        story.append(Paragraph(f"- {measure}", styles['BodyText']))
+    doc.build(story)
+    return pdf_bytes.getvalue()
+
+
+# Function to hash the content that goes into a measures PDF
+def _content_hash(title, measures):
+    return hashlib.sha256("\n".join((title,) + tuple(measures)).encode("utf-8")).hexdigest()
+
+
+# Function to get the measures PDF for a BMI category, rendering it only once
+def generate_measures_pdf(bmi_category):
+    entry = BMI_MEASURES[bmi_category]
+    key = (bmi_category, _content_hash(entry['title'], entry['measures']))
+    pdf_data = _pdf_cache.get(key)
+    record_cache("measures_pdf", pdf_data is not None)
+    if pdf_data is None:
+        with _lock:
+            pdf_data = _pdf_cache.get(key)
+            if pdf_data is None:
+                pdf_data = render_measures_pdf(entry['title'], entry['measures'])
+                _pdf_cache[key] = pdf_data
+    return pdf_data
+
+
+# Background renderer for personalized plan reports, so a long build never blocks a script run
+REPORT_WORKERS = 2
+REPORT_CACHE_SIZE = 128
+_report_pool = ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix="plan-report")
+_report_futures = OrderedDict()
+
+
+# Function to wrap table cells so long dish names flow onto several lines
+def _table_rows(rows, style):
+    return [[Paragraph(str(value), style) for value in row] for row in rows]
+
+
+# Function to render a weekly plan, its nutrition totals and the profile details to a PDF stream
+def render_plan_pdf(out, title, details, plan, columns, summary):
+    doc = SimpleDocTemplate(out, pagesize=landscape(letter), leftMargin=36, rightMargin=36,
+                            topMargin=36, bottomMargin=36)
+    styles = getSampleStyleSheet()
+    cell_style = styles['BodyText'].clone('PlanCell', fontSize=8, leading=10)
+    header_style = ParagraphStyle('PlanHeader', parent=cell_style, fontName='Helvetica-Bold')
+    grid_style = TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ])
+
+    story = [Paragraph(title, styles['Title'])]
+    for label, value in details:
+        story.append(Paragraph(f"<b>{label}:</b> {value}", styles['BodyText']))
+    story.append(Spacer(1, 12))
+
+    story.append(Paragraph("One-Week Diet Plan", styles['Heading2']))
+    header = _table_rows([columns], header_style)
+    body = _table_rows(plan[columns].itertuples(index=False, name=None), cell_style)
+    plan_table = Table(header + body, repeatRows=1)
+    plan_table.setStyle(grid_style)
+    story.append(plan_table)
+    story.append(Spacer(1, 12))
+
+    story.append(Paragraph("Nutritional Information", styles['Heading2']))
+    nutrition_rows = [("Nutrient", "Weekly Total", "Daily Average")]
+    for column, total, mean in zip(summary.columns, summary.totals, summary.means):
+        nutrition_rows.append((column, f"{total:,.0f}", f"{mean:,.1f}"))
+    nutrition_table = Table(_table_rows(nutrition_rows[:1], header_style) + _table_rows(nutrition_rows[1:], cell_style),
+                            hAlign='LEFT')
+    nutrition_table.setStyle(grid_style)
+    story.append(nutrition_table)
+
+    doc.build(story)
+
+
+# Function to build a plan report in a spooled buffer and return its bytes
+@profiled("reports.build_plan_report")
+def _build_plan_report(title, details, plan, columns, summary):
+    with tempfile.SpooledTemporaryFile(max_size=1 << 20) as out:
+        render_plan_pdf(out, title, details, plan, columns, summary)
+        out.seek(0)
+        return out.read()
+
+
+# Function to key a plan report by everything that ends up in it
+def plan_report_key(title, details, plan, columns, summary):
+    meals = pd.util.hash_pandas_object(plan[columns], index=False).to_numpy().tobytes()
+    digest = hashlib.sha256(meals)
+    digest.update(repr((title, tuple(details), tuple(columns), summary.key)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+# Function to start (or reuse) the background build of a plan report; returns a Future of PDF bytes
+def request_plan_report(title, details, plan, columns, summary):
+    details = tuple(details)
+    columns = list(columns)
+    key = plan_report_key(title, details, plan, columns, summary)
+    with _lock:
+        future = _report_futures.get(key)
+        if future is not None and not (future.done() and future.exception() is not None):
+            _report_futures.move_to_end(key)
+            record_cache("plan_report", True)
+            return future
+        record_cache("plan_report", False)
+        future = _report_pool.submit(_build_plan_report, title, details, plan, columns, summary)
+        _report_futures[key] = future
+        while len(_report_futures) > REPORT_CACHE_SIZE:
+            _report_futures.popitem(last=False)
+    return future
+
+
+# Function to get a plan report's PDF bytes, starting its build on first request (a download click)
+def plan_report_pdf(title, details, plan, columns, summary):
+    return request_plan_report(title, details, plan, columns, summary).result()
@@ -0,0 +1,428 @@
+import argparse
+import atexit
+import glob
+import gzip
+import json
+import math
+import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks (Windows): run one writing process per log file
+    fcntl = None
+
+# Structured log of what users ask for: one JSON line per page dispatch and per plan, BMI and news
+# request. Callers only put events on an in-memory queue; a background thread writes them in
+# batches, and when the file passes REQUEST_LOG_ROTATE_MB it is renamed and gzip-compressed
+# (requests-<time>-<pid>.jsonl.gz beside it). Summarize with:
+#   python request_log.py summary [logs/requests.jsonl ...]
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ENABLED = os.environ.get("REQUEST_LOG_ENABLED", "1").lower() not in ("0", "false", "no")
+REQUEST_LOG = os.environ.get("REQUEST_LOG", os.path.join(BASE_DIR, "logs", "requests.jsonl"))
+ROTATE_BYTES = int(float(os.environ.get("REQUEST_LOG_ROTATE_MB", 64)) * 2 ** 20)
+KEEP_ROTATED = int(os.environ.get("REQUEST_LOG_KEEP", 50))
+# Request kinds whose profile counts toward the top profiles (the answers worth precomputing)
+PLAN_KINDS = ("plan", "infant_plan", "api_plan", "api_infant_plan")
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 1.0
+# Events waiting for the writer; when it falls this far behind new events are dropped, not waited on
+QUEUE_SIZE = 10000
+
+_queue = queue.Queue(maxsize=QUEUE_SIZE)
+_writer = None
+_dropped = 0
+_lock = threading.Lock()
+
+
+# Function to queue one event without blocking; fields must be JSON-serializable
+def log_event(kind, **fields):
+    global _dropped
+    if not ENABLED:
+        return
+    try:
+        _queue.put_nowait({"ts": round(time.time(), 3), "kind": kind, **fields})
+    except queue.Full:
+        with _lock:
+            _dropped += 1
+        return
+    if _writer is None:
+        _start_writer()
+
+
+# Function to time a block of code and log it as one event with an 'ms' field; the block can add
+# fields to the yielded dict, and an exception is recorded under 'error'
+@contextmanager
+def timed_event(kind, **fields):
+    if not ENABLED:
+        yield fields
+        return
+    start = time.perf_counter()
+    try:
+        yield fields
+    except Exception as exc:
+        fields["error"] = type(exc).__name__
+        raise
+    finally:
+        log_event(kind, ms=round((time.perf_counter() - start) * 1000, 3), **fields)
+
+
+# Function to start the background writer once per process
+def _start_writer():
+    global _writer
+    with _lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_write_loop, args=(REQUEST_LOG,), name="request-log-writer",
+                                       daemon=True)
+            _writer.start()
+            atexit.register(flush)
+
+
+# Function run by the writer thread: collect up to BATCH_SIZE events (waiting at most
+# FLUSH_INTERVAL after the first one), append them in one write, rotate when the file is full
+def _write_loop(path):
+    while True:
+        batch, waiters = [], []
+        item = _queue.get()
+        deadline = time.monotonic() + FLUSH_INTERVAL
+        while True:
+            if isinstance(item, threading.Event):
+                # flush() marker: write what has been collected, then wake the caller
+                waiters.append(item)
+                break
+            batch.append(item)
+            remaining = deadline - time.monotonic()
+            if len(batch) >= BATCH_SIZE or remaining <= 0:
+                break
+            try:
+                item = _queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+        try:
+            if batch:
+                write_batch(path, batch)
+        except Exception as exc:
+            # Logging must never take the app down; the batch is lost and reported on stderr
+            print(f"request_log: could not write {len(batch)} event(s) to {path}: {exc}", file=sys.stderr)
+        for waiter in waiters:
+            waiter.set()
+
+
+# Function to wait until every event queued so far is written (True unless it timed out)
+def flush(timeout=5.0):
+    if _writer is None or not _writer.is_alive():
+        return True
+    done = threading.Event()
+    try:
+        _queue.put(done, timeout=timeout)
+    except queue.Full:
+        return False
+    return done.wait(timeout)
+
+
+# Function to get the number of events dropped because the writer fell behind
+def dropped():
+    return _dropped
+
+
+# Function to hold an advisory lock on a log file: shared while appending, exclusive while
+# rotating, so no process appends to a file that is being renamed (no-op without fcntl)
+@contextmanager
+def _file_lock(path, exclusive=False):
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+# Function to append a batch of events to the log as JSON lines, rotating the file when it is full
+def write_batch(path, events):
+    data = "".join(json.dumps(event, separators=(",", ":"), default=str) + "\n" for event in events)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with _file_lock(path):
+        # Opened per batch so a rotation by another process is picked up on the next one
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.write(data)
+            size = fh.tell()
+    if size >= ROTATE_BYTES:
+        rotate(path)
+
+
+# Function to get the rotated, compressed files of a log, oldest first
+def rotated_files(path):
+    stem, ext = os.path.splitext(path)
+    return sorted(glob.glob(f"{glob.escape(stem)}-*{ext}.gz"))
+
+
+# Function to move the current log aside, compress it and drop the oldest compressed files
+def rotate(path):
+    stem, ext = os.path.splitext(path)
+    with _file_lock(path, exclusive=True):
+        # Another process may have rotated it while this one waited for the lock
+        if not os.path.exists(path) or os.path.getsize(path) < ROTATE_BYTES:
+            return None
+        rotated = f"{stem}-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')}-{os.getpid()}{ext}"
+        os.replace(path, rotated)
+    tmp_path = f"{rotated}.gz.tmp"
+    with open(rotated, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+        for chunk in iter(lambda: src.read(1 << 20), b""):
+            dst.write(chunk)
+    os.replace(tmp_path, f"{rotated}.gz")
+    os.remove(rotated)
+    for old_path in rotated_files(path)[:-KEEP_ROTATED or None]:
+        try:
+            os.remove(old_path)
+        except OSError:
+            pass
+    return f"{rotated}.gz"
+
+
+class LatencyHistogram:
+    # Latencies in log-spaced buckets, each `precision` wide relative to its value: memory depends
+    # on the range of values seen, not on how many there are
+    def __init__(self, precision=0.01):
+        self.base = math.log1p(precision)
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        index = math.ceil(math.log(ms) / self.base) if ms > 0 else None
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    # Function to get the p-th percentile (the upper edge of the bucket holding it)
+    def percentile(self, p):
+        rank = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for index in sorted(self.buckets, key=lambda index: -math.inf if index is None else index):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return 0.0 if index is None else min(math.exp(index * self.base), self.max)
+        return self.max
+
+
+class TopCounter:
+    # Approximate most-frequent keys in bounded memory (Misra-Gries): exact while there are at most
+    # `capacity` distinct keys; beyond that every count may be low by at most `undercount`
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counts = {}
+        self.undercount = 0
+
+    def add(self, key):
+        if key in self.counts:
+            self.counts[key] += 1
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = 1
+        else:
+            # No room: count the newcomer and every tracked key down by one, dropping keys that reach zero
+            self.undercount += 1
+            self.counts = {other: count - 1 for other, count in self.counts.items() if count > 1}
+
+    # Function to get the n most frequent keys as (key, count)
+    def top(self, n):
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+# Function to get the profile a plan request is for, or None
+def profile_key(event):
+    if "month" in event:
+        return event["month"]
+    parts = [event[field] for field in ("age", "gender", "meal_type", "bmi_category") if event.get(field) is not None]
+    return " | ".join(map(str, parts)) or None
+
+
+class LogSummary:
+    # Running totals over a stream of events: counts, latency, cache hits and precompiled answers per
+    # kind, and the most requested profiles, pages and news topics
+    def __init__(self, capacity=1000):
+        self.events = 0
+        self.malformed = 0
+        self.first_ts = None
+        self.last_ts = None
+        self.kinds = {}
+        self.latency = {}
+        self.cache = {}
+        self.precompiled = {}
+        self.errors = {}
+        self.profiles = TopCounter(capacity)
+        self.pages = TopCounter(capacity)
+        self.topics = TopCounter(capacity)
+
+    def add(self, event):
+        kind = event.get("kind")
+        self.events += 1
+        self.kinds[kind] = self.kinds.get(kind, 0) + 1
+        ts = event.get("ts")
+        if isinstance(ts, (int, float)):
+            self.first_ts = ts if self.first_ts is None else min(self.first_ts, ts)
+            self.last_ts = ts if self.last_ts is None else max(self.last_ts, ts)
+        ms = event.get("ms")
+        if isinstance(ms, (int, float)):
+            self.latency.setdefault(kind, LatencyHistogram()).add(ms)
+        if "cache_hit" in event:
+            stats = self.cache.setdefault(kind, [0, 0])
+            stats[0 if event["cache_hit"] else 1] += 1
+        if "precompiled" in event:
+            stats = self.precompiled.setdefault(kind, [0, 0])
+            stats[0 if event["precompiled"] else 1] += 1
+        status = event.get("status")
+        if "error" in event or (isinstance(status, int) and status >= 400):
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+        if kind == "page":
+            self.pages.add(event.get("page"))
+        elif kind == "news":
+            self.topics.add(event.get("topic"))
+        elif kind in PLAN_KINDS:
+            profile = profile_key(event)
+            if profile is not None:
+                self.profiles.add(profile)
+
+    # Function to get the summary as a JSON-ready dict
+    def as_dict(self, top=10):
+        kinds = {}
+        for kind, count in sorted(self.kinds.items(), key=lambda item: -item[1]):
+            kinds[str(kind)] = {
+                "events": count,
+                "errors": self.errors.get(kind, 0),
+                "latency_ms": _latency_dict(self.latency.get(kind)),
+                "cache_hit_rate": _hit_rate(self.cache.get(kind)),
+                "precompiled_rate": _hit_rate(self.precompiled.get(kind)),
+            }
+        return {
+            "events": self.events,
+            "malformed_lines": self.malformed,
+            "first_ts": self.first_ts,
+            "last_ts": self.last_ts,
+            "kinds": kinds,
+            "top_profiles": _top_dict(self.profiles, top),
+            "top_pages": _top_dict(self.pages, top),
+            "top_topics": _top_dict(self.topics, top),
+        }
+
+
+# Function to summarize a latency histogram (None when nothing was timed)
+def _latency_dict(histogram):
+    if histogram is None:
+        return None
+    return {"p50": histogram.percentile(50), "p95": histogram.percentile(95), "p99": histogram.percentile(99),
+            "mean": histogram.total / histogram.count, "max": histogram.max}
+
+
+# Function to get a rate from [yes, no] counts (None when there were none)
+def _hit_rate(stats):
+    if not stats or not sum(stats):
+        return None
+    return stats[0] / sum(stats)
+
+
+# Function to get a top list with the bound on how low its counts may be
+def _top_dict(counter, top):
+    return {"undercount": counter.undercount,
+            "rows": [{"key": key, "requests": count} for key, count in counter.top(top)]}
+
+
+# Function to stream the events of one log file (plain or gzip-compressed), counting bad lines
+def read_events(path, summary):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", errors="replace") as fh:
+        try:
+            for line in fh:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    summary.malformed += 1
+                    continue
+                if isinstance(event, dict):
+                    yield event
+                else:
+                    summary.malformed += 1
+        except EOFError:
+            # A compressed file cut short: keep what was readable
+            summary.malformed += 1
+
+
+# Function to summarize log files in one pass, in memory that does not grow with their size
+def summarize(paths, capacity=1000):
+    summary = LogSummary(capacity)
+    for path in paths:
+        for event in read_events(path, summary):
+            summary.add(event)
+    return summary
+
+
+# Function to format a summary as text tables
+def format_summary(summary, top=10):
+    data = summary.as_dict(top)
+    lines = [f"{data['events']:,} events"]
+    if data["first_ts"] is not None:
+        start, end = (time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(data[key])) for key in ("first_ts", "last_ts"))
+        lines[0] += f" from {start} to {end}"
+    if data["malformed_lines"]:
+        lines[0] += f" ({data['malformed_lines']:,} malformed lines skipped)"
+    lines.append("")
+    lines.append(f"{'kind':<16} {'events':>10} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+                 f"{'max ms':>9} {'cache hit':>9} {'precomp':>9}")
+    lines.append("-" * 94)
+    for kind, stats in data["kinds"].items():
+        latency = stats["latency_ms"] or {}
+        cells = [f"{latency[key]:>9.1f}" if key in latency else f"{'-':>9}" for key in ("p50", "p95", "p99", "max")]
+        rates = [f"{stats[key]:>9.1%}" if stats[key] is not None else f"{'-':>9}"
+                 for key in ("cache_hit_rate", "precompiled_rate")]
+        lines.append(f"{kind:<16} {stats['events']:>10,} {stats['errors']:>7,} {' '.join(cells)} {' '.join(rates)}")
+    for title, field in (("profiles", "top_profiles"), ("pages", "top_pages"), ("news topics", "top_topics")):
+        rows = data[field]["rows"]
+        if not rows:
+            continue
+        lines.append("")
+        bound = f" (counts may be low by up to {data[field]['undercount']:,})" if data[field]["undercount"] else ""
+        lines.append(f"Top {title}{bound}:")
+        for row in rows:
+            lines.append(f"  {row['requests']:>10,}  {row['key']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize request logs: top profiles, pages and news topics, "
+                                                 "latency percentiles and cache hit rates per request kind.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    summary_parser = commands.add_parser("summary", help="summarize log files in one streaming pass")
+    summary_parser.add_argument("paths", nargs="*",
+                                help=f"log files, plain or .gz (default: {REQUEST_LOG} and its rotated files)")
+    summary_parser.add_argument("--top", type=int, default=10, help="rows per top list (default: %(default)s)")
+    summary_parser.add_argument("--capacity", type=int, default=1000,
+                                help="distinct keys tracked per top list; counts are exact below this")
+    summary_parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or rotated_files(REQUEST_LOG) + ([REQUEST_LOG] if os.path.exists(REQUEST_LOG) else [])
+    if not paths:
+        print(f"No request logs found at {REQUEST_LOG}", file=sys.stderr)
+        return 1
+    summary = summarize(paths, args.capacity)
+    if args.json:
+        print(json.dumps(summary.as_dict(args.top), indent=2))
+    else:
+        print(format_summary(summary, args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from textblob import TextBlob
+from profiling import record_cache
+
+# Polarity scores keyed by a hash of the scored text, most recently used last
+SENTIMENT_CACHE_SIZE = 4096
+# Worker processes for large batches; 0 scores in the calling thread
+SENTIMENT_PROCESSES = int(os.environ.get("SENTIMENT_PROCESSES", 0))
+PROCESS_BATCH_MIN = 64
+
+_scores = OrderedDict()
+_lock = threading.Lock()
+_pool = None
+
+
+# Function to get the cache key for a piece of text
+def text_key(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+# Function to score the polarity of one text
+def polarity(text):
+    if not text:
+        return 0.0
+    return TextBlob(text).sentiment.polarity
+
+
+# Function to score a list of texts (runs in worker processes)
+def _polarities(texts):
+    return [polarity(text) for text in texts]
+
+
+# Function to get the shared process pool, creating it on first use
+def _process_pool(processes):
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=processes)
+        return _pool
+
+
+# Function to score many texts at once, reusing cached scores and scoring each new text once
+def score_texts(texts, processes=SENTIMENT_PROCESSES):
+    keys = [text_key(text or "") for text in texts]
+    scores = {}
+    with _lock:
+        for key in keys:
+            if key in _scores:
+                _scores.move_to_end(key)
+                scores[key] = _scores[key]
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in scores:
+            missing.setdefault(key, text or "")
+
+    record_cache("sentiment", True, sum(1 for key in keys if key in scores))
+    record_cache("sentiment", False, len(missing))
+    if missing:
+        missing_keys = list(missing)
+        missing_texts = [missing[key] for key in missing_keys]
+        if processes > 1 and len(missing_texts) >= PROCESS_BATCH_MIN:
+            chunk = -(-len(missing_texts) // processes)
+            chunks = [missing_texts[i:i + chunk] for i in range(0, len(missing_texts), chunk)]
+            new_scores = [score for part in _process_pool(processes).map(_polarities, chunks) for score in part]
+        else:
+            new_scores = _polarities(missing_texts)
+        with _lock:
+            for key, score in zip(missing_keys, new_scores):
+                scores[key] = score
+                _scores[key] = score
+            while len(_scores) > SENTIMENT_CACHE_SIZE:
+                _scores.popitem(last=False)
+
+    return [scores[key] for key in keys]
+
+
+# Function to get the text scored for a news article (its description, else its title)
+def article_text(article):
+    return article.get("description") or article.get("title") or ""
+
+
+# Function to attach a 'sentiment' score to every article of a News API result
+def score_articles(payload, processes=SENTIMENT_PROCESSES):
+    articles = payload.get("articles", [])
+    for article, score in zip(articles, score_texts([article_text(a) for a in articles], processes)):
+        article["sentiment"] = score
+    return payload
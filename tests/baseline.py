@@ -0,0 +1,27 @@
+import numbers
+import pandas as pd
+
+# The original app's plan lookup and workbook quirks, for checking the faster paths against them.
+# years.xlsx has rows with no Age, a 'Normal weight ' BMI with a trailing space next to
+# 'Normal weight', and day names such as 'friday' and 'MOnday'
+
+
+# Function to filter the workbook the way the original app did: four boolean masks on pd.read_excel
+def baseline_filter(df, age, gender, meal_type, bmi_category):
+    return df[(df['Age'] == age) &
+              (df['Gender'] == gender) &
+              (df['Type of Meal'] == meal_type) &
+              (df['BMI'] == bmi_category)]
+
+
+# Function to get a frame's rows as plain tuples (numbers as floats, missing cells as None), so
+# categorical, integer and Arrow-backed columns compare equal to what pd.read_excel returned
+def plan_rows(frame):
+    return [tuple(None if pd.isna(value) else float(value) if isinstance(value, numbers.Number) else value
+                  for value in row)
+            for row in frame.astype(object).itertuples(index=False)]
+
+
+# Function to sort plain rows into a canonical order, for frames whose rows were regrouped
+def sorted_rows(rows):
+    return sorted(rows, key=lambda row: [(value is None, repr(value)) for value in row])
@@ -0,0 +1,101 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pandas as pd
+import pytest
+
+# The app modules live at the repository root, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep test runs out of the request log
+os.environ.setdefault("REQUEST_LOG_ENABLED", "0")
+
+import plan_store
+
+
+# years.xlsx as the original app read it, on every page load
+@pytest.fixture(scope="session")
+def workbook():
+    return pd.read_excel(plan_store.EXCEL_PATH)
+
+
+# Every profile in the workbook, including rows with no Age and the 'Normal weight ' spelling,
+# plus the app's own BMI spelling and a profile with no plan
+@pytest.fixture(scope="session")
+def profiles(workbook):
+    keys = workbook[plan_store.PLAN_KEY_COLUMNS].drop_duplicates()
+    profiles = list(keys.itertuples(index=False, name=None))
+    profiles += [(float('nan'), 'Female', 'Veg', 'Overweight'), (3, 'Male', 'Veg', 'Normal weight'),
+                 (3, 'Male', 'Veg', 'Normal weight '), (9, 'Male', 'Veg', 'Normal weight')]
+    return profiles
+
+
+# A private plan cache and no loaded snapshots, so each test parses and publishes years.xlsx itself
+@pytest.fixture
+def plan_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(plan_store, "CACHE_DIR", str(tmp_path / ".cache"))
+    monkeypatch.setattr(plan_store, "_snapshots", {})
+    return tmp_path / ".cache"
+
+
+NEWS_FIXTURE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures",
+                                 "news_everything.json")
+
+
+class StubNewsApi:
+    # Local stand-in for the News API: serves the recorded fixture for every topic unless a topic has
+    # its own (status, body) response, and holds requests for a gated topic until it is released
+    def __init__(self):
+        with open(NEWS_FIXTURE_PATH, "rb") as fh:
+            self.body = fh.read()
+        self.responses = {}
+        self.gates = {}
+        self.topics = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                topic = parse_qs(urlparse(self.path).query)["q"][0]
+                with stub._lock:
+                    stub.topics.append(topic)
+                gate = stub.gates.get(topic)
+                if gate is not None:
+                    gate.wait(10)
+                status, body = stub.responses.get(topic, (200, stub.body))
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    # Function to hold requests for a topic until the returned event is set
+    def gate(self, topic):
+        self.gates[topic] = threading.Event()
+        return self.gates[topic]
+
+    # Function to count the requests made for a topic
+    def requests_for(self, topic):
+        with self._lock:
+            return self.topics.count(topic)
+
+    def close(self):
+        for gate in self.gates.values():
+            gate.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    stub = StubNewsApi()
+    yield stub
+    stub.close()
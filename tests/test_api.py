@@ -0,0 +1,84 @@
+import asyncio
+import json
+import time
+import api
+
+
+# Test that non-finite height or weight is rejected instead of answered with non-JSON numbers
+def test_plan_rejects_non_finite_measurements():
+    for query in ("age=3&gender=Male&meal_type=Veg&height=95&weight=inf",
+                  "age=3&gender=Male&meal_type=Veg&height=nan&weight=14"):
+        status, body = api.handle("GET", "/plan", query, b"")
+        assert status == 400
+        assert json.loads(body) == {"error": "height and weight must be finite numbers"}
+
+
+# Test that malformed profiles in a batch are reported in place, like failed lookups
+def test_batch_reports_malformed_profiles_inline():
+    profiles = [{"age": 3, "gender": "Male", "meal_type": "Veg", "height": 95, "weight": 14},
+                {"age": 3, "gender": "Male", "meal_type": "Veg", "height": 95},
+                "not a profile",
+                {"age": 3, "gender": "Male", "meal_type": "Veg", "height": 95, "weight": float("inf")}]
+    status, body = api.handle("POST", "/plans", "", json.dumps(profiles).encode())
+    assert status == 200
+    results = json.loads(body)
+    assert len(results) == 4
+    assert results[0]["profile"]["age"] == 3
+    assert results[1] == {"status": 400, "error": "Missing parameter 'weight'"}
+    assert results[2] == {"status": 400, "error": "Each profile must be a JSON object"}
+    assert results[3] == {"status": 400, "error": "height and weight must be finite numbers"}
+
+
+# Function to send one GET request through the ASGI app and return its status
+async def _asgi_get(path, query=b""):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await api.app({"type": "http", "method": "GET", "path": path, "query_string": query}, receive, send)
+    return messages[0]["status"]
+
+
+# Test that a slow request does not hold up the event loop for other connections
+def test_slow_requests_run_concurrently(monkeypatch):
+    handle = api.handle
+
+    def slow_handle(*args):
+        time.sleep(0.3)
+        return handle(*args)
+
+    monkeypatch.setattr(api, "handle", slow_handle)
+
+    async def both():
+        return await asyncio.gather(_asgi_get("/health"), _asgi_get("/health"))
+
+    start = time.perf_counter()
+    assert asyncio.run(both()) == [200, 200]
+    assert time.perf_counter() - start < 0.55
+
+
+# Test that the plan memo is keyed by BMI category, not by the exact height and weight
+def test_plan_memo_keyed_by_bmi_category():
+    api._plan_content.cache_clear()
+    first = api.handle("GET", "/plan", "age=3&gender=Female&meal_type=Veg&height=95&weight=14", "")
+    second = api.handle("GET", "/plan", "age=3&gender=Female&meal_type=Veg&height=96.5&weight=14.2", "")
+    assert first[0] == second[0] == 200
+    first, second = json.loads(first[1]), json.loads(second[1])
+    assert first["bmi_category"] == second["bmi_category"] and first["bmi"] != second["bmi"]
+    assert second["profile"]["height"] == 96.5 and second["plan"] == first["plan"]
+    assert api._plan_content.cache_info().hits == 1
+
+
+# Test that out-of-range measurements are rejected before the BMI is computed
+def test_plan_rejects_out_of_range_measurements():
+    base = "age=3&gender=Male&meal_type=Veg"
+    for query, error in ((f"{base}&height=1e308&weight=14", "height must be greater than 0 and at most 300 cm"),
+                         (f"{base}&height=0&weight=14", "height must be greater than 0 and at most 300 cm"),
+                         (f"{base}&height=95&weight=0", "weight must be greater than 0 and at most 500 kg"),
+                         (f"{base}&height=95&weight=-3", "weight must be greater than 0 and at most 500 kg")):
+        status, body = api.handle("GET", "/plan", query, b"")
+        assert (status, json.loads(body)) == (400, {"error": error})
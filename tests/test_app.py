@@ -0,0 +1,94 @@
+import functools
+import json
+import streamlit.testing.v1.local_script_runner as local_script_runner
+from streamlit.runtime.scriptrunner import RerunData
+from streamlit.testing.v1 import AppTest
+import news
+import profiling
+from conftest import NEWS_FIXTURE_PATH
+
+
+def _diet_page():
+    import app
+    app.diet_recommendation_page()
+
+
+def _bmi_page():
+    import app
+    app.bmi_calculator_page()
+
+
+def _news_page():
+    import app
+    app.News_page()
+
+
+# Test that the diet form with only a height warns about the weight instead of failing
+def test_diet_page_without_weight_warns():
+    at = AppTest.from_function(_diet_page, default_timeout=60).run()
+    at.radio[0].set_value("1-5").run()
+    at.number_input[0].set_value(95.0)
+    at.button[0].click().run()
+    assert not at.exception
+    assert any("Weight should be greater than zero" in warning.value for warning in at.warning)
+
+
+# Test that the BMI form with only a height warns about the weight instead of failing
+def test_bmi_page_without_weight_warns():
+    at = AppTest.from_function(_bmi_page, default_timeout=60).run()
+    at.number_input[0].set_value(95.0)
+    at.button[0].click().run()
+    assert not at.exception
+    assert any("Weight should be greater than zero" in warning.value for warning in at.warning)
+
+
+# Test that BMI inputs are held by their form until submitted, then give the original BMI
+def test_bmi_inputs_wait_for_submit():
+    at = AppTest.from_function(_bmi_page, default_timeout=60).run()
+    assert {number.form_id for number in at.number_input} == {"bmi_inputs"}
+    at.number_input[0].set_value(95.0)
+    at.number_input[1].set_value(14.0)
+    at.run()
+    assert [number.value for number in at.number_input] == [0.0, 0.0]
+    assert not at.markdown
+    at.number_input[0].set_value(95.0)
+    at.number_input[1].set_value(14.0)
+    at.button[0].click().run()
+    assert at.markdown[0].value == f"### Calculated BMI: {14.0 / 0.95 ** 2:.2f}"
+
+
+# Test that changing the news page number reruns only the article list fragment: the topic picker,
+# heading and API call are not run again, and the page shows the same articles as before
+def test_news_paging_reruns_only_fragment(stub, monkeypatch):
+    from sentiment import score_articles
+    monkeypatch.setattr(profiling, "ENABLED", True)
+    profiling.reset()
+    service = news.NewsService("test-key", stub.url, enrich=score_articles)
+    monkeypatch.setitem(news._services, ("test-key", news.NEWS_API_URL), service)
+    with open(NEWS_FIXTURE_PATH, encoding="utf-8") as fh:
+        titles = [article["title"] for article in json.load(fh)["articles"]]
+    try:
+        at = AppTest.from_function(_news_page, default_timeout=60)
+        at.secrets["NEWS_API_KEY"] = "test-key"
+        at.run()
+        topic = at.selectbox[0].value
+        assert at.markdown[-1].value.startswith("Showing articles 1 - 5")
+
+        # AppTest always reruns the whole script; send the paging rerun scoped to the fragment
+        # holding the widget, as the browser does
+        fragment_ids = list(at._fragment_storage._fragments)
+        assert len(fragment_ids) == 1
+        monkeypatch.setattr(local_script_runner, "RerunData",
+                            functools.partial(RerunData, fragment_id_queue=fragment_ids, is_fragment_scoped_rerun=True))
+        at.number_input[0].set_value(2).run()
+        assert not at.exception
+        assert at.markdown[-1].value.startswith("Showing articles 6 - 10")
+        shown = [markdown.value for markdown in at.markdown if markdown.value.startswith("**Title:**")]
+        assert [title.split("](")[0][len("**Title:** ["):] for title in shown] == titles[5:10]
+        # Only the fragment's elements were sent again, and the topic was fetched once
+        assert not at.selectbox and not at.subheader
+        assert stub.requests_for(topic) == 1
+        assert profiling.snapshot()[2] == [{"scope": "fragment:news_articles", "runs": 1}]
+    finally:
+        service.close()
+        profiling.reset()
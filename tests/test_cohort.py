@@ -0,0 +1,44 @@
+import math
+import numpy as np
+import pandas as pd
+import pytest
+import cohort
+import growth
+
+
+# Test that missing and non-numeric ages give NaN z-scores instead of failing the lookup
+def test_bmi_zscores_unknown_age_is_nan():
+    z = growth.bmi_zscores([np.nan, np.inf, 36], ['Male', 'Female', 'Male'], [16, 16, 16])
+    assert math.isnan(z[0]) and math.isnan(z[1])
+    assert math.isfinite(z[2])
+
+
+# Test that a cohort file with blank and non-numeric ages is processed, leaving those rows unclassified
+def test_process_cohort_with_bad_ages(tmp_path):
+    input_path, output_path = tmp_path / "cohort.csv", tmp_path / "out.csv"
+    pd.DataFrame({'age': ['3', '', 'three', '4'], 'gender': ['Male', 'Female', 'Male', 'Female'],
+                  'height': [95, 95, 95, 100], 'weight': [14, 14, 14, 16],
+                  'meal_type': ['Veg', 'Veg', 'Veg', 'Non-Veg']}).to_csv(input_path, index=False)
+    assert cohort.process_cohort(str(input_path), str(output_path)) == 4
+    result = pd.read_csv(output_path)
+    assert result['bmi_zscore'].isna().tolist() == [False, True, True, False]
+    assert result['bmi_category'].isna().tolist() == [False, True, True, False]
+    assert result.loc[[1, 2], 'plan_days'].tolist() == [0, 0]
+
+
+# Test that ages outside the 0-60 month reference are left unclassified instead of clipped
+def test_bmi_zscores_out_of_reference_age_is_nan():
+    z = growth.bmi_zscores([-1, 61, 108, 60], ['Male'] * 4, [16] * 4)
+    assert np.isnan(z[:3]).all() and math.isfinite(z[3])
+
+
+# Test that each reason a child cannot be assessed gets its own error
+def test_assess_child_errors():
+    with pytest.raises(ValueError, match="BMI must be greater than zero"):
+        growth.assess_child(36, 'Male', 0.0)
+    with pytest.raises(ValueError, match="covers 0-60 months"):
+        growth.assess_child(108, 'Male', 16)
+    with pytest.raises(ValueError, match="expected one of Male, Female"):
+        growth.assess_child(36, 'Other', 16)
+    assessment = growth.assess_child(36, 'Male', 16)
+    assert assessment['percentile'] == pytest.approx(50 * (1 + math.erf(assessment['zscore'] / math.sqrt(2))))
@@ -0,0 +1,35 @@
+import json
+import os
+import pandas as pd
+import pytest
+import core
+import infant_plans
+
+# Each month's plan as the original generate_diet_plan in app.py built it, column by column
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures",
+                             "infant_plans_baseline.json")
+
+
+@pytest.fixture(scope="module")
+def baseline_plans():
+    with open(BASELINE_PATH, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+# Test that the frozen table gives every month the frame the original if/elif chain built
+def test_infant_frames_match_original_plans(baseline_plans):
+    assert infant_plans.INFANT_MONTHS == tuple(baseline_plans)
+    for month, columns in baseline_plans.items():
+        frame = core.generate_diet_plan(month)
+        pd.testing.assert_frame_equal(frame, pd.DataFrame(columns), obj=month)
+        assert core.generate_diet_plan(month) is frame
+
+
+# Test that the shared plan table cannot be changed and an unknown age names the valid months
+def test_infant_table_is_read_only():
+    with pytest.raises(TypeError):
+        infant_plans.INFANT_PLANS["1 month"] = {}
+    with pytest.raises(TypeError):
+        infant_plans.INFANT_PLANS["1 month"]["Day"] = ()
+    with pytest.raises(KeyError, match="expected one of 1 month"):
+        infant_plans.infant_plan_frame("13 months")
@@ -0,0 +1,105 @@
+import json
+import time
+import pytest
+import news
+
+
+@pytest.fixture
+def service(stub):
+    service = news.NewsService("test-key", stub.url)
+    yield service
+    service.close()
+
+
+# Function to wait until a condition holds (False when it did not within the timeout)
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+# Test that entries expire after the TTL and the least recently used entry is evicted first
+def test_ttl_cache_expiry_and_lru_eviction():
+    now = [0.0]
+    cache = news.TTLCache(max_entries=2, ttl=10, clock=lambda: now[0])
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    now[0] = 10
+    assert cache.get("a") is None and len(cache) == 1
+
+
+# Test that a topic is fetched once and served from the cache until its entry expires
+def test_get_serves_cached_results_until_ttl(stub, service):
+    now = [0.0]
+    service.cache.clock = lambda: now[0]
+    first = service.get("Whole grains for toddlers")
+    assert service.get("Whole grains for toddlers") is first
+    assert stub.requests_for("Whole grains for toddlers") == 1
+    now[0] = service.cache.ttl
+    service.get("Whole grains for toddlers")
+    assert stub.requests_for("Whole grains for toddlers") == 2
+
+
+# Test that concurrent requests for a topic share the one fetch in flight
+def test_concurrent_requests_share_one_fetch(stub, service):
+    gate = stub.gate("Encouraging self-feeding")
+    first = service.submit("Encouraging self-feeding")
+    second = service.submit("Encouraging self-feeding")
+    assert second is first
+    gate.set()
+    assert first.result(5)["status"] == "ok"
+    assert stub.requests_for("Encouraging self-feeding") == 1
+
+
+# Test that a non-JSON body is reported as a NewsApiError and nothing is cached
+def test_non_json_response_raises(stub, service):
+    stub.responses["Hydration tips for toddlers"] = (502, b"<html>Bad gateway</html>")
+    with pytest.raises(news.NewsApiError, match="HTTP 502 with a non-JSON body"):
+        service.get("Hydration tips for toddlers")
+    with pytest.raises(news.NewsApiError):
+        service.get("Hydration tips for toddlers")
+    assert stub.requests_for("Hydration tips for toddlers") == 2
+
+
+# Test that an error payload is reported with the API's message
+def test_error_response_raises_api_message(stub, service):
+    body = json.dumps({"status": "error", "code": "apiKeyInvalid", "message": "Your API key is invalid."})
+    stub.responses["Dental health and nutrition"] = (401, body.encode())
+    with pytest.raises(news.NewsApiError, match="Your API key is invalid."):
+        service.get("Dental health and nutrition")
+
+
+# Test that a caller waiting longer than its timeout gets TimeoutError
+def test_get_times_out_on_slow_api(stub, service):
+    stub.gate("Vitamin D and its importance")
+    with pytest.raises(TimeoutError):
+        service.get("Vitamin D and its importance", timeout=0.2)
+
+
+# Test that the refresher fetches every topic up front and fetches them again on each pass
+def test_refresher_warms_and_refreshes_topics(stub, service):
+    topics = ("Snack ideas for young children", "Healthy snacks on the go")
+    service.start_refresher(topics, interval=0.2)
+    assert wait_for(lambda: all(service.cache.get((topic, news.date_window())) for topic in topics))
+    assert wait_for(lambda: all(stub.requests_for(topic) >= 2 for topic in topics))
+
+
+# Test that an on-demand fetch neither waits for busy prefetch workers nor behind a queued prefetch
+def test_on_demand_fetch_not_queued_behind_prefetch(stub):
+    service = news.NewsService("test-key", stub.url, prefetch_workers=1)
+    try:
+        stub.gate("Food allergies in toddlers")
+        service.prefetch(("Food allergies in toddlers", "Whole grains for toddlers"))
+        assert wait_for(lambda: stub.requests_for("Food allergies in toddlers") == 1)
+        assert service.get("Eating together as a family", timeout=5)["status"] == "ok"
+        # Queued behind the held prefetch: taken over by the page's request
+        assert service.get("Whole grains for toddlers", timeout=5)["status"] == "ok"
+    finally:
+        service.close()
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+import core
+import infant_plans
+import nutrition
+import plan_store
+from baseline import baseline_filter
+from plan_store import NUTRIENT_COLUMNS
+
+
+# Function to check a summary against the sums the original chart builders computed on the plan
+def assert_matches_plan(summary, plan):
+    totals = plan[NUTRIENT_COLUMNS].sum()
+    assert summary.columns == tuple(NUTRIENT_COLUMNS)
+    assert list(summary.days) == plan['Day'].tolist()
+    np.testing.assert_array_equal(summary.totals, totals.to_numpy(dtype=np.float64))
+    np.testing.assert_allclose(summary.means, totals.to_numpy(dtype=np.float64) / len(plan))
+    for position, column in enumerate(NUTRIENT_COLUMNS):
+        shares = (plan[column] / totals[column] * 100).to_numpy(dtype=np.float64)
+        np.testing.assert_allclose(summary.shares[:, position], shares)
+
+
+# Test that memoized summaries of the workbook plans match direct sums over the original rows
+def test_plan_summaries_match_workbook(plan_cache, workbook, profiles):
+    for profile in profiles:
+        expected = baseline_filter(workbook, *profile)
+        if expected.empty:
+            continue
+        plan = plan_store.lookup_plan(*profile)
+        summary = nutrition.plan_summary(plan)
+        assert_matches_plan(summary, expected)
+        assert nutrition.plan_summary(plan) is summary
+
+
+# Test that infant plan summaries match the nutrient columns the original infant charts summed
+@pytest.mark.parametrize("month", infant_plans.INFANT_MONTHS)
+def test_infant_summaries_match_plan(month):
+    plan = core.generate_diet_plan(month)
+    summary = nutrition.plan_summary(plan)
+    assert_matches_plan(summary, plan)
+    assert nutrition.plan_summary(plan) is summary
+    with pytest.raises(ValueError):
+        summary.totals[0] = 0
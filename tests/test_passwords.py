@@ -0,0 +1,55 @@
+import threading
+import time
+import pytest
+import passwords
+
+
+# Test that a hash that outlasts its timeout is reported like a full pool and counted
+def test_slow_check_reports_pool_busy():
+    pool = passwords.VerificationPool(workers=1, queue_size=0)
+    with pytest.raises(passwords.PoolBusyError):
+        pool.call(time.sleep, 0.3, timeout=0.05)
+    stats = pool.stats()
+    assert (stats["submitted"], stats["timed_out"]) == (1, 1)
+
+
+# Test that work beyond the workers and queue is rejected instead of queued
+def test_full_pool_rejects():
+    pool = passwords.VerificationPool(workers=1, queue_size=0)
+    release = threading.Event()
+    worker = threading.Thread(target=pool.call, args=(release.wait, 5))
+    worker.start()
+    time.sleep(0.05)
+    with pytest.raises(passwords.PoolBusyError):
+        pool.call(time.sleep, 0, wait=0.05)
+    release.set()
+    worker.join()
+    stats = pool.stats()
+    assert (stats["completed"], stats["rejected"]) == (1, 1)
+
+
+# Test that a malformed stored hash is a failed check, not an exception
+@pytest.mark.parametrize("stored", ["scrypt$16384$8$1$not base64!$@@", "scrypt$16384$8", "scrypt$3$8$1$AAAA$AAAA",
+                                    "pbkdf2_sha256$many$AAAA$AAAA", "bcrypt$whatever"])
+def test_malformed_hash_fails_check(stored):
+    assert passwords.verify_password("Secret1!", stored) is False
+    assert passwords.VerificationPool(workers=1, queue_size=0).verify("Secret1!", stored) is False
+
+
+# Test that the stand-in hash for unknown users is made once, on the pool's thread
+def test_dummy_hash_made_once_off_caller_thread(monkeypatch):
+    threads = []
+    real_hash = passwords.hash_password
+
+    def recording_hash(password):
+        threads.append(threading.current_thread().name)
+        return real_hash(password)
+    monkeypatch.setattr(passwords, "hash_password", recording_hash)
+    pool = passwords.VerificationPool(workers=2, queue_size=4)
+    checks = [threading.Thread(target=pool.verify, args=("Secret1!", None)) for _ in range(4)]
+    for check in checks:
+        check.start()
+    for check in checks:
+        check.join()
+    assert len(threads) == 1 and threads[0].startswith("password-verify")
+    assert pool.verify("dummy-password", None) is False
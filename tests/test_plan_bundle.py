@@ -0,0 +1,43 @@
+import os
+import shutil
+import warnings
+import pandas as pd
+import plan_bundle
+import plan_store
+
+
+# Test that a deployed bundle is kept while the workbook is only touched and dropped once it is edited
+def test_bundle_dropped_when_workbook_edited(tmp_path, monkeypatch):
+    monkeypatch.setattr(plan_store, "CACHE_DIR", str(tmp_path / ".cache"))
+    excel_path, bundle_path = str(tmp_path / "years.xlsx"), str(tmp_path / "plan_bundle.json.gz")
+    shutil.copy(plan_store.EXCEL_PATH, excel_path)
+    plan_bundle.compile_bundle(excel_path, bundle_path)
+    bundle = plan_bundle.get_bundle(bundle_path, excel_path)
+    assert bundle is not None
+
+    stat = os.stat(excel_path)
+    os.utime(excel_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert plan_bundle.get_bundle(bundle_path, excel_path) is bundle
+
+    df = pd.read_excel(excel_path)
+    df.loc[0, 'Total Calorie (kcal)'] += 1
+    df.to_excel(excel_path, index=False)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        assert plan_bundle.get_bundle(bundle_path, excel_path) is None
+    assert any("changed since it was compiled" in str(warning.message) for warning in caught)
+
+
+# Test that a bundle compiled by other versions of the plan, nutrition or chart code is ignored
+def test_bundle_ignored_when_code_changed(tmp_path, monkeypatch):
+    monkeypatch.setattr(plan_store, "CACHE_DIR", str(tmp_path / ".cache"))
+    bundle_path = str(tmp_path / "plan_bundle.json.gz")
+    plan_bundle.compile_bundle(plan_store.EXCEL_PATH, bundle_path)
+    assert plan_bundle.get_bundle(bundle_path) is not None
+
+    plan_bundle._bundles.clear()
+    monkeypatch.setattr(plan_bundle, "_code_digest", "0" * 64)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        assert plan_bundle.get_bundle(bundle_path) is None
+    assert any("code changed since it was compiled" in str(warning.message) for warning in caught)
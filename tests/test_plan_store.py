@@ -0,0 +1,82 @@
+import os
+import shutil
+import pandas as pd
+import core
+import plan_store
+from baseline import baseline_filter, plan_rows, sorted_rows
+
+
+# Function to make pd.read_excel fail, to show a load is served without parsing the workbook
+def forbid_read_excel(monkeypatch):
+    def read_excel(*args, **kwargs):
+        raise AssertionError("years.xlsx was parsed again")
+    monkeypatch.setattr(plan_store.pd, "read_excel", read_excel)
+
+
+# Test that every load shares one frame holding the same rows as pd.read_excel, parsed only once
+def test_shared_frame_matches_workbook(plan_cache, workbook, monkeypatch):
+    import app
+    frame = app.load_data(plan_store.EXCEL_PATH)
+    assert sorted_rows(plan_rows(frame)) == sorted_rows(plan_rows(workbook))
+    assert list(frame.columns) == list(workbook.columns)
+
+    forbid_read_excel(monkeypatch)
+    assert app.load_data(plan_store.EXCEL_PATH) is frame
+    assert plan_store.load_plan_frame() is frame
+
+
+# Test that indexed lookups return the rows the original boolean masks did, for every profile
+def test_index_lookup_matches_masks(plan_cache, workbook, profiles):
+    frame = plan_store.load_plan_frame()
+    plans = plan_store.lookup_plans(profiles)
+    for profile, plan in zip(profiles, plans):
+        expected = plan_rows(baseline_filter(workbook, *profile))
+        assert plan_rows(plan) == expected, profile
+        assert plan_rows(core.filter_data(frame, *profile)) == expected, profile
+        assert plan_store.lookup_plan(*profile) is plan
+
+
+# Test that a process starting after the table was published maps it instead of parsing the
+# workbook, and gets the same frame and plans as pd.read_excel
+def test_mapped_frame_matches_workbook(plan_cache, workbook, profiles, monkeypatch):
+    cache_path, _ = plan_store.publish()
+    assert os.path.exists(cache_path)
+    expected = plan_store.contiguous_plans(plan_store.compact_plan_frame(workbook))
+
+    forbid_read_excel(monkeypatch)
+    frame = plan_store.load_plan_frame()
+    # Same values and layout; only the integer type behind the Age categories differs
+    pd.testing.assert_frame_equal(frame, expected, check_dtype=False, check_categorical=False)
+    assert (frame.dtypes == 'category').tolist() == (expected.dtypes == 'category').tolist()
+    assert sorted_rows(plan_rows(frame)) == sorted_rows(plan_rows(workbook))
+    for profile in profiles:
+        assert plan_rows(plan_store.lookup_plan(*profile)) == plan_rows(baseline_filter(workbook, *profile))
+    # Numeric columns are views of the read-only mapping
+    assert not frame['Total Calorie (kcal)'].to_numpy().flags.writeable
+
+
+# Test that an edited workbook is published as a new version and the old table is pruned
+def test_edited_workbook_published_as_new_version(plan_cache, workbook, tmp_path):
+    excel_path = str(tmp_path / "years.xlsx")
+    shutil.copy(plan_store.EXCEL_PATH, excel_path)
+    old_path, _ = plan_store.publish(excel_path)
+    edited = workbook.copy()
+    edited.loc[0, 'Total Calorie (kcal)'] += 1
+    edited.to_excel(excel_path, index=False)
+
+    frame = plan_store.load_plan_frame(excel_path)
+    new_path = plan_store._cache_path(os.path.abspath(excel_path), plan_store.get_snapshot(excel_path).digest)
+    assert new_path != old_path and os.path.exists(new_path) and not os.path.exists(old_path)
+    assert sorted_rows(plan_rows(frame)) == sorted_rows(plan_rows(edited))
+
+
+# Test that the compact layout keeps every value and its masks match the original ones for every
+# profile, including values that are not among a column's categories
+def test_categorical_frame_matches_workbook(workbook, profiles):
+    compact = plan_store.compact_plan_frame(workbook)
+    assert all(compact[column].dtype == 'category' for column in plan_store.CATEGORICAL_COLUMNS)
+    assert all(compact[column].dtype == 'int16' for column in plan_store.NUTRIENT_COLUMNS)
+    assert plan_rows(compact) == plan_rows(workbook)
+    assert compact['BMI'].cat.categories.tolist().count('Normal weight ') == 1
+    for profile in profiles + [(3, 'Male', 'Vegan', 'Normal weight'), (3.5, 'Male', 'Veg', 'Normal weight')]:
+        assert plan_rows(core.filter_data(compact, *profile)) == plan_rows(baseline_filter(workbook, *profile))
@@ -0,0 +1,64 @@
+import json
+import time
+from collections import deque
+import pytest
+from streamlit.testing.v1 import AppTest
+import login
+import profiling
+
+
+@pytest.fixture
+def enabled(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "ENABLED", True)
+    monkeypatch.setattr(profiling, "PROFILE_LOG", str(tmp_path / "profile.jsonl"))
+    profiling.reset()
+    yield tmp_path / "profile.jsonl"
+    profiling.reset()
+
+
+# Function to read the events written to a profile log
+def read_log(path):
+    with open(path, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh]
+
+
+def _app():
+    import app
+    app.main()
+
+
+# Test that events nobody flushes are capped, dropping the oldest, and the drop is logged
+def test_pending_events_capped_and_drops_counted(enabled, monkeypatch):
+    monkeypatch.setattr(profiling, "_pending", deque(maxlen=3))
+    for run in range(5):
+        profiling.record_rerun(f"fragment:{run}")
+    assert profiling.dropped() == 2
+    assert profiling.flush() == 4
+    events = read_log(enabled)
+    assert [event["name"] for event in events[:3]] == ["fragment:2", "fragment:3", "fragment:4"]
+    assert events[3]["kind"] == "dropped" and events[3]["count"] == 2
+    assert profiling.dropped() == 0
+
+
+# Test that events recorded outside a page render (API, background threads) are flushed by time
+def test_events_flushed_periodically(enabled, monkeypatch):
+    monkeypatch.setattr(profiling, "FLUSH_INTERVAL", 0.05)
+    monkeypatch.setattr(profiling, "_flusher", None)
+    profiling.record_cache("api:plan", hit=False)
+    deadline = time.monotonic() + 5
+    while not enabled.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [event["name"] for event in read_log(enabled)] == ["api:plan"]
+
+
+# Test that ?admin=1 shows the timings only to users listed as admins
+@pytest.mark.parametrize("username, shown", [("guest", False), ("admin", True)])
+def test_admin_page_needs_admin_user(enabled, monkeypatch, username, shown):
+    monkeypatch.setattr(login, "ADMIN_USERS", {"admin"})
+    at = AppTest.from_function(_app, default_timeout=60)
+    at.session_state["logged_in"] = True
+    at.session_state["username"] = username
+    at.query_params["admin"] = "1"
+    at.run()
+    assert not at.exception
+    assert any(title.value == "Performance" for title in at.title) == shown
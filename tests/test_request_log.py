@@ -0,0 +1,35 @@
+import api
+import request_log
+
+
+# Test that API plan requests are logged with the BMI category, so top profiles use full keys
+def test_api_plan_event_has_full_profile(monkeypatch):
+    events = []
+    monkeypatch.setattr(request_log, "ENABLED", True)
+    monkeypatch.setattr(request_log, "log_event", lambda kind, **fields: events.append(dict(kind=kind, **fields)))
+    status, _ = api.handle("GET", "/plan", "age=3&gender=Male&meal_type=Veg&height=95&weight=14", "")
+    assert status == 200
+    assert events[-1]["kind"] == "api_plan"
+    assert request_log.profile_key(events[-1]) == "3 | Male | Veg | Normal weight"
+
+
+# Test the summary of a log file: latency, cache hits and precompiled answers per kind, top profiles
+def test_summary_of_log_file(tmp_path):
+    path = str(tmp_path / "requests.jsonl")
+    request_log.write_batch(path, [
+        {"ts": 1.0, "kind": "plan", "ms": 4.0, "age": 3, "gender": "Male", "meal_type": "Veg",
+         "bmi_category": "Normal weight", "precompiled": True},
+        {"ts": 2.0, "kind": "api_plan", "ms": 2.0, "age": 3, "gender": "Male", "meal_type": "Veg",
+         "bmi_category": "Normal weight", "cache_hit": True},
+        {"ts": 3.0, "kind": "api_plan", "ms": 8.0, "age": 4, "gender": "Female", "meal_type": "Veg",
+         "status": 404, "cache_hit": False},
+    ])
+    with open(path, "a") as fh:
+        fh.write("not json\n")
+    data = request_log.summarize([path]).as_dict()
+    assert (data["events"], data["malformed_lines"]) == (3, 1)
+    assert data["kinds"]["plan"]["precompiled_rate"] == 1.0
+    assert data["kinds"]["plan"]["cache_hit_rate"] is None
+    assert data["kinds"]["api_plan"]["cache_hit_rate"] == 0.5
+    assert data["kinds"]["api_plan"]["errors"] == 1
+    assert data["top_profiles"]["rows"][0] == {"key": "3 | Male | Veg | Normal weight", "requests": 2}
@@ -0,0 +1,26 @@
+import csv
+import passwords
+import user_store
+
+
+# Function to write a legacy users CSV
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(user_store.CSV_COLUMNS)
+        writer.writerows(rows)
+
+
+# Test that the legacy CSV is imported and hashed by the first store only, not on every start
+def test_csv_imported_once_per_database(tmp_path, monkeypatch):
+    db_path, csv_path = str(tmp_path / "users.db"), str(tmp_path / "users.csv")
+    write_csv(csv_path, [("amy", "Secret1!", "2024-01-01 10:00:00")])
+    store = user_store.UserStore(db_path, csv_path)
+    assert passwords.verify_password("Secret1!", store.get_user("amy")["password"])
+
+    write_csv(csv_path, [("amy", "Secret1!", "2024-01-01 10:00:00"), ("ben", "Secret2!", "2024-01-02 10:00:00")])
+    imports = []
+    monkeypatch.setattr(user_store.UserStore, "import_csv", lambda self, path: imports.append(path))
+    reopened = user_store.UserStore(db_path, csv_path)
+    assert imports == []
+    assert reopened.exists("amy") and not reopened.exists("ben")
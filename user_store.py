@@ -0,0 +1,147 @@
+import csv
+import os
+import sqlite3
+import sys
+import threading
+from passwords import get_verification_pool, hash_password, is_hashed
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, "user_data.db")
+CSV_PATH = os.path.join(BASE_DIR, "user_data.csv")
+CSV_COLUMNS = ["username", "password", "signup_date"]
+# Stored in PRAGMA user_version once the legacy CSV is imported and its passwords are hashed
+SCHEMA_VERSION = 1
+
+
+class UserExistsError(Exception):
+    pass
+
+
+class UserStore:
+    # SQLite-backed users table with a unique username key; one connection per thread.
+    # The password column holds salted scrypt hashes (see passwords.py). The legacy CSV is imported
+    # once per database, not on every start: PRAGMA user_version records that it was done
+    def __init__(self, db_path=DB_PATH, csv_path=CSV_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        conn = self._connection()
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS users ("
+                         "username TEXT PRIMARY KEY, password TEXT NOT NULL, signup_date TEXT NOT NULL)")
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            if csv_path and os.path.exists(csv_path):
+                self.import_csv(csv_path)
+            self.migrate_plaintext()
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    # Function to get this thread's connection, opening it on first use
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Concurrent writers wait on SQLite's lock instead of failing immediately
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    # Function to copy users from the legacy CSV, keeping any account that already exists
+    def import_csv(self, csv_path=CSV_PATH):
+        with open(csv_path, newline="", encoding="utf-8") as fh:
+            rows = list(csv.DictReader(fh))
+        conn = self._connection()
+        new_rows = []
+        for row in rows:
+            if conn.execute("SELECT 1 FROM users WHERE username = ?", (row["username"],)).fetchone() is None:
+                password = row["password"]
+                new_rows.append((row["username"], password if is_hashed(password) else hash_password(password),
+                                 row["signup_date"]))
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO users (username, password, signup_date) VALUES (?, ?, ?)",
+                             new_rows)
+        return len(new_rows)
+
+    # Function to replace any plaintext passwords left in the table with hashes
+    def migrate_plaintext(self):
+        conn = self._connection()
+        plaintext = [(username, password) for username, password in
+                     conn.execute("SELECT username, password FROM users") if not is_hashed(password)]
+        with conn:
+            conn.executemany("UPDATE users SET password = ? WHERE username = ?",
+                             [(hash_password(password), username) for username, password in plaintext])
+        return len(plaintext)
+
+    # Function to write every user out in the legacy CSV layout
+    def export_csv(self, csv_path=CSV_PATH):
+        rows = self._connection().execute("SELECT username, password, signup_date FROM users ORDER BY rowid")
+        with open(csv_path, "w", newline="", encoding="utf-8") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(CSV_COLUMNS)
+            writer.writerows(rows)
+
+    # Function to get one user's row by username, or None
+    def get_user(self, username):
+        row = self._connection().execute(
+            "SELECT username, password, signup_date FROM users WHERE username = ?", (username,)).fetchone()
+        return dict(row) if row is not None else None
+
+    # Function to check whether a username is taken
+    def exists(self, username):
+        return self.get_user(username) is not None
+
+    # Function to add a new user; raises UserExistsError if the username is taken
+    def add_user(self, username, password, signup_date):
+        password_hash = get_verification_pool().hash(password)
+        try:
+            with self._connection() as conn:
+                conn.execute("INSERT INTO users (username, password, signup_date) VALUES (?, ?, ?)",
+                             (username, password_hash, signup_date))
+        except sqlite3.IntegrityError:
+            raise UserExistsError(username)
+
+    # Function to check a username and password against the same user's row.
+    # Raises passwords.PoolBusyError when too many checks are already queued
+    def check_credentials(self, username, password):
+        user = self.get_user(username)
+        return get_verification_pool().verify(password, user["password"] if user is not None else None)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+# Function to get the process-wide user store
+def get_user_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = UserStore()
+        return _store
+
+
+# Function to hash the plaintext passwords in a legacy CSV in place (one-shot migration)
+def migrate_csv(csv_path=CSV_PATH):
+    with open(csv_path, newline="", encoding="utf-8") as fh:
+        rows = list(csv.DictReader(fh))
+    migrated = 0
+    for row in rows:
+        if not is_hashed(row["password"]):
+            row["password"] = hash_password(row["password"])
+            migrated += 1
+    tmp_path = f"{csv_path}.tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp_path, csv_path)
+    return migrated
+
+
+if __name__ == "__main__":
+    # python user_store.py migrate [user_data.csv]
+    if len(sys.argv) >= 2 and sys.argv[1] == "migrate":
+        path = sys.argv[2] if len(sys.argv) > 2 else CSV_PATH
+        print(f"Hashed {migrate_csv(path)} plaintext password(s) in {path}")
+    else:
+        print("usage: python user_store.py migrate [csv_path]")
+        sys.exit(2)